@@ -1,11 +1,17 @@
-from flask import Flask, render_template
+from flask import Flask, Response, jsonify, render_template
+from flask.logging import default_handler
 import logging
-from logging.handlers import RotatingFileHandler
-from .routes.dash import dashboard_bp, init_dash_app
+import os
+from .routes.dash import dashboard_bp, init_dash_app, start_warmup
+from .metrics import CONTENT_TYPE, REGISTRY
+from .telemetry import init_request_metrics, latency_report, start_log_listener
+from .compression import init_compression
 
 def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'rickeyhenderson'
+    # BASEBOTICS_WARMUP=0 turns off the background leaderboard warm-up
+    app.config['WARMUP_ENABLED'] = os.environ.get('BASEBOTICS_WARMUP', '1') != '0'
 
     # Register blueprints
     from .routes.base import base_bp
@@ -18,16 +24,42 @@ def create_app():
     # Initialize Dash app
     init_dash_app(app)
 
-    # Set up logging with timestamps
-    handler = RotatingFileHandler('/var/www/basebotics/logs/flask_app.log', maxBytes=10000, backupCount=1)
-    handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
+    # Log with timestamps, written to disk by a background listener thread;
+    # Flask's default stderr handler would write on the request thread
+    start_log_listener(app.logger)
+    app.logger.removeHandler(default_handler)
 
-    @app.before_request
-    def initialize_logging():
-        app.logger.info('Flask app started')
+    # Leaderboard stage timings are logged at INFO by the dash modules
+    app.logger.getChild('routes.dash').setLevel(logging.INFO)
+
+    # Precompute the common leaderboards off the request path. The warm-up
+    # imports the analytics stack, so it starts once the worker has served
+    # its first request: boot and that request do not pay for it
+    if app.config.get('WARMUP_ENABLED', True):
+        warmup_started = False
+
+        @app.after_request
+        def start_warmup_after_first_request(response):
+            nonlocal warmup_started
+            if not warmup_started:
+                warmup_started = True
+                start_warmup()
+            return response
+
+    # Per-route and per-Dash-callback latency histograms
+    init_request_metrics(app)
+
+    # gzip/brotli for JSON and HTML responses; registered after the timing
+    # hook so it runs first and its cost is part of the measured latency
+    init_compression(app)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    @app.route('/metrics/latency')
+    def latency():
+        return jsonify(latency_report())
 
     @app.errorhandler(500)
     def internal_error(error):
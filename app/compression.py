@@ -0,0 +1,76 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: responses are gzipped only
+    brotli = None
+
+# Response types worth compressing: Dash callback and layout JSON, pages
+# and /metrics. Dash's JS bundles are static files left to the web server.
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain')
+
+# Bodies smaller than this are sent as they are
+MIN_COMPRESS_BYTES = 500
+
+# Fast settings: callbacks are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def accepted_encodings(header):
+    """
+    Content codings an Accept-Encoding header allows (q > 0).
+    """
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def compress_body(body, accept_encoding):
+    """
+    (encoding, compressed body) in the best coding the client accepts:
+    brotli when installed, else gzip. None when it accepts neither.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br', brotli.compress(body, quality=BROTLI_QUALITY)
+    if 'gzip' in accepted:
+        return 'gzip', gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return None
+
+
+def init_compression(app):
+    """
+    Compress the JSON, HTML and text responses of `app`, Dash callbacks
+    included, for clients that accept gzip or brotli. Streamed responses
+    (the leaderboard export) are passed through untouched.
+    """
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < MIN_COMPRESS_BYTES:
+            return response
+        compressed = compress_body(body, request.headers.get('Accept-Encoding'))
+        if compressed is None:
+            return response
+        encoding, data = compressed
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        return response
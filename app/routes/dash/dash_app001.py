@@ -1,8 +1,96 @@
 from flask import Flask
-from dash import Dash, dcc, html, Input, Output, dash_table, State, ClientsideFunction
+from dash import Dash, dcc, html, Input, Output, State, dash_table, ClientsideFunction
 from datetime import datetime
-import pandas as pd
-from .utils import DHHCalculator
+from .table import filter_frame, sort_frame, page_frame
+from .payload import RECORDS_JS, columnar
+
+# Leaderboard columns shown in the table, mapped to their display names
+DISPLAY_COLUMNS = {
+    "player_name": "Player", "BBE": "BBE", "DHH%": "DHH%", "Sd(LA)": "Sd(LA)",
+    "LA": "AVG LA", "Barrel%": "Barrel%", "MaxEV": "MaxEV", "P95 EV": "P95 EV",
+    "P90 EV": "P90 EV", "P50 EV": "P50 EV", "EV": "AVG EV", "AVG Hit Distance": "AVG Hit Distance"
+}
+
+# Initial DatePickerRange window, and the engine behind the table
+DEFAULT_WINDOW = (datetime(2023, 5, 1), datetime(2024, 5, 1))
+LEADERBOARD_ENGINE = 'rollup'
+
+# Leaderboard views (leaderboard.GROUPINGS), the header of their name column, and
+# the engine computing the non-batter views, all of them in one scan
+LEADERBOARD_VIEWS = {"batter": "Batters", "pitcher": "Pitchers", "batting_team": "Batting teams",
+                     "pitching_team": "Pitching teams"}
+VIEW_NAME_HEADERS = {"batter": "Player", "pitcher": "Pitcher", "batting_team": "Team", "pitching_team": "Team"}
+GROUPING_ENGINE = 'sql'
+
+def leaderboard_frame(start_date, end_date, view='batter'):
+    """
+    Display-ready leaderboard of one view for a date range, indexed by
+    MLBID, or team for the team views (the table's row ids). Kept
+    server-side: repeated calls are answered from the process-wide result
+    cache, and every non-batter view comes from the same cached
+    DHHCalculator.process_groupings result.
+    """
+    if view not in LEADERBOARD_VIEWS:
+        raise ValueError(f"view must be one of {list(LEADERBOARD_VIEWS)}")
+    from .utils import default_calculator
+    if view == 'batter':
+        df = default_calculator().process(start_date, end_date, 0, engine=LEADERBOARD_ENGINE)  # Get all data
+        df = df.set_index('MLBID')
+    else:
+        df = default_calculator().process_groupings(start_date, end_date, 0, engine=GROUPING_ENGINE)
+        df = df[df['Grouping'] == view].set_index('ID').rename(columns={'Name': 'player_name'})
+    df = df[list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
+    df.index.name = 'id'
+    return df
+
+def leaderboard_columns(view='batter'):
+    """
+    DataTable columns of the leaderboard, headed for `view`.
+    """
+    return [
+        {"name": VIEW_NAME_HEADERS[view] if col == "Player" else col, "id": col}
+        if col in ["Player", "BBE"] else {"name": col, "id": col, "type": "numeric", "format": {"specifier": ".2f"}}
+        for col in DISPLAY_COLUMNS.values()
+    ]
+
+# Period splits offered by the comparison view, and the metrics it can compare
+COMPARE_GRANULARITIES = {"half": "Halves", "month": "Months", "week": "Weeks"}
+COMPARE_METRICS = [col for col in DISPLAY_COLUMNS.values() if col != "Player"]
+
+def comparison_frame(start_date, end_date, granularity, metric, min_bbe=0):
+    """
+    One row per player and one `metric` column per period of the date
+    range, plus the change from the first period to the last. All periods
+    come from a single scan (DHHCalculator.process_periods); periods where
+    a player has fewer than `min_bbe` BBE are left empty.
+    """
+    from .utils import default_calculator
+    df = default_calculator().process_periods(granularity, 0, engine=LEADERBOARD_ENGINE,
+                                              stdate=start_date, endate=end_date)
+    periods = list(dict.fromkeys(df['Period']))
+    df = df[df['BBE'] >= min_bbe].rename(columns=DISPLAY_COLUMNS)
+    # Pivot on the ID alone: a (Player, MLBID) index with dropna=False
+    # would hold every name/ID combination
+    wide = df.pivot_table(index='MLBID', columns='Period', values=metric, aggfunc='first')
+    wide = wide.reindex(columns=periods).dropna(how='all')
+    if periods:
+        wide['Change'] = wide[periods[-1]] - wide[periods[0]]
+    wide.columns.name = None
+    names = df.drop_duplicates('MLBID').set_index('MLBID')['Player']
+    wide.insert(0, 'Player', names.reindex(wide.index))
+    return wide.sort_values('Player', kind='stable').reset_index(drop=True)
+
+# Game-log columns of the player drill-down (see drilldown.game_log)
+DRILLDOWN_LOG_COLUMNS = ["game_date", "BBE", "DHH", "Barrels", "EV", "MaxEV", "LA"]
+
+def player_drilldown_for(batter, start_date, end_date):
+    """
+    One player's batted balls, class rates and game log for a date range,
+    read through the batter offset index.
+    """
+    from .drilldown import player_drilldown
+    from .utils import default_calculator
+    return player_drilldown(default_calculator(), batter, start_date, end_date)
 
 def create_dash_app(flask_app):
     dash_app = Dash(
@@ -36,25 +124,42 @@ def create_dash_app(flask_app):
     dash_app.layout = html.Div([
         html.H1("Player Performance Tracker", style={"textAlign": "center"}),
 
-        # Store for the full dataset
+        # Date range of the server-side leaderboard (the rows stay on the server)
         dcc.Store(id='stored-data'),
 
+        # Columnar table pages from the server (see payload.columnar), expanded
+        # into DataTable records in the browser
+        dcc.Store(id='leaderboard-payload'),
+        dcc.Store(id='comparison-payload'),
+        dcc.Store(id='drilldown-gamelog-payload'),
+
         # Responsive layout for date picker and download button
         html.Div([
             html.Div([
                 dcc.DatePickerRange(
                     id='date-picker-range',
-                    start_date=datetime(2023, 5, 1),
-                    end_date=datetime(2024, 5, 1),
+                    start_date=DEFAULT_WINDOW[0],
+                    end_date=DEFAULT_WINDOW[1],
                     display_format='YYYY-MM-DD',
                     style={'marginRight': '15px'}
                 )
             ], style={'flex': '1', 'marginRight': '15px'}),
             
-            # Download section
+            # Download section: a plain link to the streaming export endpoint
             html.Div([
-                html.Button(
-                    "Download CSV", 
+                dcc.Dropdown(
+                    id="download-format",
+                    options=[
+                        {"label": "CSV", "value": "csv"},
+                        {"label": "Parquet", "value": "parquet"},
+                        {"label": "Arrow", "value": "arrow"}
+                    ],
+                    value="csv",
+                    clearable=False,
+                    style={'width': '120px', 'marginRight': '10px'}
+                ),
+                html.A(
+                    "Download", 
                     id="download-button", 
                     n_clicks=0,
                     style={
@@ -62,10 +167,12 @@ def create_dash_app(flask_app):
                         "color": "white",
                         "border": "none",
                         "padding": "8px 16px",
+                        "textDecoration": "none",
+                        "display": "inline-block",
                         "transition": "background-color 0.3s"
                     }
                 ),
-            ], style={'flex': '1'})
+            ], style={'flex': '1', 'display': 'flex', 'alignItems': 'center'})
         ], style={'display': 'flex', 'flexWrap': 'wrap', 'alignItems': 'center', 'marginBottom': '20px'}),
 
         # BBE Filter section with both slider and number input
@@ -79,7 +186,9 @@ def create_dash_app(flask_app):
                     value=0,
                     marks=None,
                     tooltip={"placement": "bottom", "always_visible": True},
-                    updatemode='drag',
+                    # Dragging only moves drag_value (synced in the browser);
+                    # value, which drives the table query, changes on release
+                    updatemode='mouseup',
                     className='custom-slider'
                 ),
             ], style={'flex': '1', 'marginRight': '15px', 'marginLeft': '15px'}),
@@ -92,6 +201,15 @@ def create_dash_app(flask_app):
             )
         ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '20px'}),
 
+        # Whose contact quality the table ranks
+        dcc.RadioItems(
+            id='leaderboard-view',
+            options=[{"label": label, "value": value} for value, label in LEADERBOARD_VIEWS.items()],
+            value='batter',
+            inline=True,
+            style={'marginBottom': '20px'}
+        ),
+
         # Table display with loading spinner and records per page selector
         html.Div([
             html.Label("Records per page:"),
@@ -110,11 +228,92 @@ def create_dash_app(flask_app):
         dcc.Loading(
             id="loading-table",
             type="default",
-            children=html.Div(id="output-table")
+            children=html.Div([
+                html.Div(id="output-table"),
+                dash_table.DataTable(
+                    id='leaderboard-table',
+                    columns=leaderboard_columns(),
+                    page_current=0,
+                    page_size=30,
+                    page_action="custom",
+                    sort_action="custom",
+                    sort_by=[],
+                    filter_action="custom",
+                    filter_query="",
+                    style_table={'overflowX': 'auto'},
+                    style_cell={
+                        'textAlign': 'center',
+                        'height': 'auto',
+                        'minWidth': '50px',
+                        'whiteSpace': 'normal'
+                    },
+                    style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'}
+                )
+            ])
         ),
 
-        # Hidden download component
-        dcc.Download(id="download-dataframe"),
+        # Drill-down of the player whose leaderboard row was clicked
+        html.Div(id='player-drilldown', style={'display': 'none'}, children=[
+            html.H2(id='drilldown-title', style={"textAlign": "center", "marginTop": "30px"}),
+            html.Div([
+                dcc.Graph(id='drilldown-scatter', style={'flex': '2', 'minWidth': '300px'}),
+                dcc.Graph(id='drilldown-rates', style={'flex': '1', 'minWidth': '300px'})
+            ], style={'display': 'flex', 'flexWrap': 'wrap'}),
+            dash_table.DataTable(
+                id='drilldown-gamelog',
+                columns=[
+                    {"name": col, "id": col, "type": "numeric", "format": {"specifier": ".1f"}}
+                    if col in ["EV", "MaxEV", "LA"] else {"name": col, "id": col}
+                    for col in DRILLDOWN_LOG_COLUMNS
+                ],
+                page_size=10,
+                style_table={'overflowX': 'auto'},
+                style_cell={'textAlign': 'center', 'minWidth': '50px'},
+                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'}
+            )
+        ]),
+
+        # Period comparison: the same date range split into halves, months or weeks
+        html.H2("Period Comparison", style={"textAlign": "center", "marginTop": "30px"}),
+        html.Div([
+            dcc.RadioItems(
+                id='compare-granularity',
+                options=[{"label": label, "value": value} for value, label in COMPARE_GRANULARITIES.items()],
+                value='half',
+                inline=True,
+                style={'marginRight': '15px'}
+            ),
+            dcc.Dropdown(
+                id='compare-metric',
+                options=[{"label": metric, "value": metric} for metric in COMPARE_METRICS],
+                value='DHH%',
+                clearable=False,
+                style={'width': '200px'}
+            )
+        ], style={'display': 'flex', 'flexWrap': 'wrap', 'alignItems': 'center', 'marginBottom': '20px'}),
+        html.Div(id="comparison-message"),
+        dcc.Loading(
+            id="loading-comparison",
+            type="default",
+            children=dash_table.DataTable(
+                id='comparison-table',
+                page_current=0,
+                page_size=30,
+                page_action="custom",
+                sort_action="custom",
+                sort_by=[],
+                filter_action="custom",
+                filter_query="",
+                style_table={'overflowX': 'auto'},
+                style_cell={
+                    'textAlign': 'center',
+                    'height': 'auto',
+                    'minWidth': '50px',
+                    'whiteSpace': 'normal'
+                },
+                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'}
+            )
+        ),
     ])
 
     @dash_app.callback(
@@ -122,106 +321,192 @@ def create_dash_app(flask_app):
          Output('bbe-slider', 'max'),
          Output('bbe-slider', 'marks')],
         [Input("date-picker-range", "start_date"),
-         Input("date-picker-range", "end_date")]
+         Input("date-picker-range", "end_date"),
+         Input('leaderboard-view', 'value')]
     )
-    def update_stored_data(start_date, end_date):
-        parquet_file = 'savant_2023-03-30_2024-09-30.parquet'
-        google_sheet_url = "https://docs.google.com/spreadsheets/d/112FJwhapiSNgxepFJQhJnudk_ub5PI9GBN7DMUKBTjc/export?format=csv"
-        db_file_name = "/var/www/basebotics/datab/google_sheet.db"
-        table_name = "google_sheet"
-        output_file = "/var/www/basebotics/datab/google_sheet.csv"
-
-        dhh_calculator = DHHCalculator(parquet_file, google_sheet_url, db_file_name, table_name, output_file, "/var/www/basebotics/datab")
-
+    def update_stored_data(start_date, end_date, view):
         try:
-            df = dhh_calculator.process(start_date, end_date, 0)  # Get all data
-            
-            # Process the data for storage
-            columns_to_display = [
-                "player_name", "BBE", "DHH%", "Sd(LA)", "LA", "Barrel%",
-                "MaxEV", "P95 EV", "P90 EV", "P50 EV", "EV", "AVG Hit Distance"
-            ]
-            df = df[columns_to_display]
-            df.rename(columns={"player_name": "Player", "LA": "AVG LA", "EV": "AVG EV"}, inplace=True)
-            
+            df = leaderboard_frame(start_date, end_date, view)
+
             # Calculate max BBE for slider
             max_bbe = df['BBE'].max()
             
             # Create marks for slider
             marks = {i: str(i) for i in range(0, max_bbe + 1, max(1, max_bbe // 10))}
             
-            return df.to_dict('records'), max_bbe, marks
+            return {'start_date': start_date, 'end_date': end_date, 'view': view}, max_bbe, marks
         except Exception as e:
-            return [], 100, {0: '0'}
+            return None, 100, {0: '0'}
 
-    # Callback to sync slider and input
     @dash_app.callback(
-        Output('bbe-slider', 'value'),
-        Input('bbe-input', 'value'),
-        prevent_initial_call=True
+        Output('leaderboard-table', 'columns'),
+        Input('leaderboard-view', 'value')
     )
-    def update_slider(value):
-        return value or 0
+    def update_columns(view):
+        return leaderboard_columns(view)
 
-    @dash_app.callback(
-        Output('bbe-input', 'value'),
-        Input('bbe-slider', 'value'),
+    # Sync slider and input in the browser, without a server round-trip
+    dash_app.clientside_callback(
+        """
+        function(slider_value, drag_value, input_value) {
+            const no_update = window.dash_clientside.no_update;
+            const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+            if (triggered.includes('bbe-input.value')) {
+                return [input_value || 0, no_update];
+            }
+            const value = triggered.includes('bbe-slider.drag_value') ? drag_value : slider_value;
+            return [no_update, value || 0];
+        }
+        """,
+        [Output('bbe-slider', 'value'),
+         Output('bbe-input', 'value')],
+        [Input('bbe-slider', 'value'),
+         Input('bbe-slider', 'drag_value'),
+         Input('bbe-input', 'value')],
         prevent_initial_call=True
     )
-    def update_input(value):
-        return value or 0
 
     @dash_app.callback(
-        Output("output-table", "children"),
+        [Output("output-table", "children"),
+         Output('leaderboard-payload', 'data'),
+         Output('leaderboard-table', 'page_count'),
+         Output('leaderboard-table', 'page_size')],
         [Input('stored-data', 'data'),
          Input("bbe-slider", "value"),
-         Input("page-size-selector", "value")]
+         Input("page-size-selector", "value"),
+         Input('leaderboard-table', 'page_current'),
+         Input('leaderboard-table', 'sort_by'),
+         Input('leaderboard-table', 'filter_query')]
     )
-    def update_table(data, bbe_filter, page_size):
-        if not data:
-            return html.Div("No data available")
+    def update_table(query, bbe_filter, page_size, page_current, sort_by, filter_query):
+        if not query:
+            return "No data available", None, 1, 30
 
-        df = pd.DataFrame(data)
+        try:
+            df = leaderboard_frame(query['start_date'], query['end_date'], query.get('view', 'batter'))
+        except ValueError as e:
+            return str(e), None, 1, 30
         
-        # Apply BBE filter
+        # Apply BBE filter, then the table's filter and sort, on the server
         filtered_df = df[df['BBE'] >= (bbe_filter or 0)]
+        filtered_df = sort_frame(filter_frame(filtered_df, filter_query), sort_by)
 
-        return dash_table.DataTable(
-            data=filtered_df.to_dict('records'),
-            columns=[
-                {"name": col, "id": col, "type": "numeric", "format": {"specifier": ".2f"}} if col not in ["Player", "BBE"] else {"name": col, "id": col}
-                for col in filtered_df.columns
-            ],
-            page_size=page_size if page_size != -1 else len(filtered_df),
-            style_table={'overflowX': 'auto'},
-            style_cell={
-                'textAlign': 'center',
-                'height': 'auto',
-                'minWidth': '50px',
-                'whiteSpace': 'normal'
-            },
-            style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-            filter_action="native",
-            sort_action="native"
-        )
+        # Only the visible page is sent to the browser
+        page_size = page_size if page_size != -1 else max(1, len(filtered_df))
+        page_df, page_count = page_frame(filtered_df, page_current, page_size)
+
+        # The MLBID (or team) index becomes each row's id, used by the drill-down
+        return None, columnar(page_df.reset_index()), page_count, page_size
 
     @dash_app.callback(
-        Output("download-dataframe", "data"),
-        Input("download-button", "n_clicks"),
-        [State('stored-data', 'data'),
-         State("bbe-slider", "value")],
+        [Output('drilldown-title', 'children'),
+         Output('drilldown-scatter', 'figure'),
+         Output('drilldown-rates', 'figure'),
+         Output('drilldown-gamelog-payload', 'data'),
+         Output('player-drilldown', 'style')],
+        Input('leaderboard-table', 'active_cell'),
+        State('stored-data', 'data'),
         prevent_initial_call=True
     )
-    def download_data(n_clicks, data, bbe_filter):
-        if n_clicks > 0 and data:
-            df = pd.DataFrame(data)
-            filtered_df = df[df['BBE'] >= (bbe_filter or 0)]
-            
-            return dict(
-                content=filtered_df.to_csv(index=False),
-                filename='player_performance.csv'
-            )
-        
-        return None
+    def update_drilldown(active_cell, query):
+        if (not active_cell or active_cell.get('row_id') is None or not query
+                or query.get('view', 'batter') != 'batter'):
+            return None, {}, {}, None, {'display': 'none'}
+
+        drilldown = player_drilldown_for(active_cell['row_id'], query['start_date'], query['end_date'])
+        if drilldown is None:
+            return "No batted balls in this range", {}, {}, None, {'display': 'block'}
+
+        pitches = drilldown['pitches']
+        scatter = {
+            'data': [
+                {
+                    'x': group['launch_angle'].tolist(),
+                    'y': group['launch_speed'].tolist(),
+                    'text': group['game_date'].dt.strftime('%Y-%m-%d').tolist(),
+                    'type': 'scatter',
+                    'mode': 'markers',
+                    'name': hit_class,
+                    'hovertemplate': "%{text}<br>LA: %{x:.0f}<br>EV: %{y:.1f}<extra>" + hit_class + "</extra>"
+                }
+                for hit_class, group in pitches.groupby('class', observed=True)
+            ],
+            'layout': {'title': "Exit velocity by launch angle", 'xaxis': {'title': 'LA'},
+                       'yaxis': {'title': 'EV'}, 'hovermode': 'closest'}
+        }
+        rates = drilldown['rates']
+        breakdown = {
+            'data': [{'x': list(rates), 'y': [round(rate, 2) for rate in rates.values()], 'type': 'bar'}],
+            'layout': {'title': "% of BBE", 'yaxis': {'title': '%'}}
+        }
+        log = drilldown['game_log'].sort_values('game_date', ascending=False)
+        title = f"{drilldown['player_name']}: {drilldown['BBE']} BBE"
+        return title, scatter, breakdown, columnar(log, decimals=1), {'display': 'block'}
+
+    @dash_app.callback(
+        [Output('comparison-message', 'children'),
+         Output('comparison-table', 'columns'),
+         Output('comparison-payload', 'data'),
+         Output('comparison-table', 'page_count'),
+         Output('comparison-table', 'page_size')],
+        [Input('stored-data', 'data'),
+         Input('bbe-slider', 'value'),
+         Input('compare-granularity', 'value'),
+         Input('compare-metric', 'value'),
+         Input("page-size-selector", "value"),
+         Input('comparison-table', 'page_current'),
+         Input('comparison-table', 'sort_by'),
+         Input('comparison-table', 'filter_query')]
+    )
+    def update_comparison(query, bbe_filter, granularity, metric, page_size, page_current, sort_by, filter_query):
+        if not query:
+            return None, [], None, 1, 30
+
+        try:
+            df = comparison_frame(query['start_date'], query['end_date'], granularity, metric, bbe_filter or 0)
+        except (ValueError, FileNotFoundError) as e:
+            # A reversed date range, or no pitch data for it
+            return str(e), [], None, 1, 30
+        columns = [
+            {"name": col, "id": col} if col == "Player" or metric == "BBE"
+            else {"name": col, "id": col, "type": "numeric", "format": {"specifier": ".2f"}}
+            for col in df.columns
+        ]
+        df = sort_frame(filter_frame(df, filter_query), sort_by)
+
+        page_size = page_size if page_size != -1 else max(1, len(df))
+        page_df, page_count = page_frame(df, page_current, page_size)
+
+        return None, columns, columnar(page_df), page_count, page_size
+
+    # Expand the columnar pages into DataTable records in the browser
+    for table, payload in (('leaderboard-table', 'leaderboard-payload'),
+                           ('comparison-table', 'comparison-payload'),
+                           ('drilldown-gamelog', 'drilldown-gamelog-payload')):
+        dash_app.clientside_callback(RECORDS_JS, Output(table, 'data'), Input(payload, 'data'))
+
+    # Point the download link at the export endpoint for the current query;
+    # the file streams from the server without passing through Dash
+    dash_app.clientside_callback(
+        """
+        function(query, bbe_filter, export_format) {
+            if (!query) {
+                return null;
+            }
+            const params = new URLSearchParams({
+                start_date: query.start_date,
+                end_date: query.end_date,
+                view: query.view || 'batter',
+                min_bbe: bbe_filter || 0,
+                format: export_format || 'csv'
+            });
+            return '/dashboard/export?' + params.toString();
+        }
+        """,
+        Output('download-button', 'href'),
+        [Input('stored-data', 'data'),
+         Input('bbe-slider', 'value'),
+         Input('download-format', 'value')]
+    )
 
     return dash_app
@@ -1,6 +1,24 @@
 from flask import Flask
 import dash
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State
+from datetime import datetime
+
+# Initial trend range (the latest full season) and window
+TREND_DEFAULT_WINDOW = (datetime(2024, 3, 28), datetime(2024, 9, 30))
+TREND_DEFAULT_SIZE = {'bbe': 50, 'days': 30}
+
+# Players charted until the user picks some
+DEFAULT_PLAYER_COUNT = 5
+PLAYER_PLACEHOLDER = "Select players"
+
+# The rates of trends.TREND_RATES, listed here so that building the layout
+# does not import the analytics stack
+TREND_RATE_NAMES = ('DHH%', 'Barrel%')
+
+def trends_for(start_date, end_date, unit, window):
+    from .trends import rolling_trends
+    from .utils import default_calculator
+    return rolling_trends(default_calculator(), start_date, end_date, window or TREND_DEFAULT_SIZE[unit], unit)
 
 def create_dash_app002(flask_app):
     dash_app = Dash(
@@ -11,19 +29,140 @@ def create_dash_app002(flask_app):
     )
 
     dash_app.layout = html.Div([
-        html.H1("New Dash App", style={"textAlign": "center"}),
-        dcc.Graph(
-            id='example-graph',
-            figure={
-                'data': [
-                    {'x': [1, 2, 3, 4, 5], 'y': [4, 1, 3, 5, 2], 'type': 'line', 'name': 'Line 1'},
-                    {'x': [1, 2, 3, 4, 5], 'y': [2, 4, 5, 2, 1], 'type': 'bar', 'name': 'Bar 1'},
+        html.H1("Player Trends", style={"textAlign": "center"}),
+
+        html.Div([
+            dcc.DatePickerRange(
+                id='trend-date-range',
+                start_date=TREND_DEFAULT_WINDOW[0],
+                end_date=TREND_DEFAULT_WINDOW[1],
+                display_format='YYYY-MM-DD',
+                style={'marginRight': '15px'}
+            ),
+            dcc.RadioItems(
+                id='trend-unit',
+                options=[
+                    {"label": "Last N BBE", "value": "bbe"},
+                    {"label": "Last N days", "value": "days"}
                 ],
-                'layout': {
-                    'title': 'Dash Data Visualization'
-                }
-            }
+                value='bbe',
+                inline=True,
+                style={'marginRight': '15px'}
+            ),
+            html.Label("N:", style={'marginRight': '5px'}),
+            dcc.Input(
+                id='trend-window',
+                type='number',
+                value=TREND_DEFAULT_SIZE['bbe'],
+                min=1,
+                debounce=True,
+                style={'width': '80px', 'marginRight': '15px'}
+            ),
+            dcc.Checklist(
+                id='trend-rates',
+                options=[{"label": rate, "value": rate} for rate in TREND_RATE_NAMES],
+                value=list(TREND_RATE_NAMES),
+                inline=True
+            )
+        ], style={'display': 'flex', 'flexWrap': 'wrap', 'alignItems': 'center', 'marginBottom': '20px'}),
+
+        dcc.Dropdown(
+            id='trend-players',
+            multi=True,
+            placeholder=PLAYER_PLACEHOLDER,
+            style={'marginBottom': '20px'}
+        ),
+
+        html.Div(id='trend-message', style={'color': 'darkred', 'marginBottom': '10px'}),
+
+        dcc.Loading(
+            type="default",
+            children=dcc.Graph(id='trend-graph')
         )
     ])
 
+    @dash_app.callback(
+        Output('trend-window', 'value'),
+        Input('trend-unit', 'value'),
+        prevent_initial_call=True
+    )
+    def reset_window(unit):
+        return TREND_DEFAULT_SIZE[unit]
+
+    @dash_app.callback(
+        [Output('trend-players', 'options'),
+         Output('trend-players', 'value'),
+         Output('trend-players', 'placeholder')],
+        [Input('trend-date-range', 'start_date'),
+         Input('trend-date-range', 'end_date')],
+        State('trend-players', 'value')
+    )
+    def update_player_options(start_date, end_date, selected):
+        import numpy as np
+        try:
+            trends = trends_for(start_date, end_date, 'days', TREND_DEFAULT_SIZE['days'])
+        except (ValueError, FileNotFoundError) as e:
+            # A reversed date range, or no pitch data for it
+            return [], [], f"No players: {e}"
+
+        # Most batted balls first
+        totals = trends.totals()
+        order = np.argsort(-totals, kind='stable')
+        options = [
+            {"label": f"{trends.names[i]} ({totals[i]} BBE)", "value": int(trends.batters[i])}
+            for i in order
+        ]
+        selected = [batter for batter in (selected or []) if batter in trends]
+        if not selected:
+            selected = [int(trends.batters[i]) for i in order[:DEFAULT_PLAYER_COUNT]]
+        return options, selected, PLAYER_PLACEHOLDER
+
+    @dash_app.callback(
+        [Output('trend-message', 'children'),
+         Output('trend-graph', 'figure')],
+        [Input('trend-date-range', 'start_date'),
+         Input('trend-date-range', 'end_date'),
+         Input('trend-unit', 'value'),
+         Input('trend-window', 'value'),
+         Input('trend-rates', 'value'),
+         Input('trend-players', 'value')]
+    )
+    def update_graph(start_date, end_date, unit, window, rates, players):
+        import numpy as np
+        # min=1 only styles the input; typed values still arrive as they are
+        if window is not None and (window < 1 or window != int(window)):
+            return "N must be a whole number of at least 1", {}
+        try:
+            trends = trends_for(start_date, end_date, unit, window)
+        except (ValueError, FileNotFoundError) as e:
+            return str(e), {}
+        label = f"last {trends.window} {'BBE' if unit == 'bbe' else 'days'}"
+
+        data = []
+        for batter in players or []:
+            if batter not in trends:
+                continue
+            dates, window_bbe, values = trends.series(batter)
+            name = trends.name_of(batter)
+            for rate in rates or []:
+                data.append({
+                    'x': np.datetime_as_string(dates).tolist(),
+                    'y': np.round(values[rate], 2).tolist(),
+                    'customdata': window_bbe.tolist(),
+                    'type': 'scatter',
+                    'mode': 'lines',
+                    'name': f"{name} {rate}",
+                    'hovertemplate': f"%{{x}}<br>{rate}: %{{y:.1f}}<br>%{{customdata}} BBE<extra>{name}</extra>"
+                })
+
+        return None, {
+            'data': data,
+            'layout': {
+                'title': f"Rolling DHH% and Barrel% ({label})",
+                'yaxis': {'title': '%'},
+                'hovermode': 'closest',
+                'height': 600
+            }
+        }
+
     return dash_app
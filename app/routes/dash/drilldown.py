@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Batted-ball classes, in the order a ball is assigned to exactly one of
+# them for charting. The flags themselves overlap (a barrel is also solid
+# contact), so the class rates still follow the leaderboard's definitions.
+HIT_CLASSES = ['Barrel', 'Solid-Contact', 'Flare-or-Burner', 'Poorly-Weak',
+               'Poorly-Under', 'Poorly-Topped', 'Unclassified']
+
+# Pitch-level columns returned by the drill-down
+PITCH_COLUMNS = ['game_date', 'launch_speed', 'launch_angle', 'release_speed', 'hit_distance_sc',
+                 'description', 'class', 'DHH']
+
+
+def hit_class(df):
+    """
+    The first class of HIT_CLASSES each batted ball is flagged with.
+    """
+    flags = df[HIT_CLASSES].to_numpy().astype(bool)
+    first = np.where(flags.any(axis=1), flags.argmax(axis=1), len(HIT_CLASSES) - 1)
+    return pd.Categorical.from_codes(first, HIT_CLASSES)
+
+
+def game_log(df):
+    """
+    One row per game day of date-ordered pitches: BBE, DHH and barrel
+    counts, and average and max EV and average LA, from segment sums over
+    the day boundaries instead of a groupby.
+    """
+    days = df['game_date'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    bbe = np.diff(np.r_[starts, len(days)])
+    ev = df['launch_speed'].to_numpy()
+    return pd.DataFrame({
+        'game_date': days[starts],
+        'BBE': bbe,
+        'DHH': np.add.reduceat(df['DHH'].to_numpy(np.int64), starts),
+        'Barrels': np.add.reduceat(df['Barrel'].to_numpy(np.int64), starts),
+        'EV': np.add.reduceat(ev, starts) / bbe,
+        'MaxEV': np.maximum.reduceat(ev, starts),
+        'LA': np.add.reduceat(df['launch_angle'].to_numpy(), starts) / bbe,
+    })
+
+
+def player_drilldown(calculator, batter, stdate=None, endate=None):
+    """
+    A single batter's batted balls in [stdate, endate], read through the
+    batter offset index (DHHCalculator.batter_pitches): the classified
+    pitches, their class rates (% of BBE, as on the leaderboard) and the
+    game log. Returns None when the batter has no batted balls.
+    """
+    df = calculator.batter_pitches(batter, stdate, endate)
+    if df.empty:
+        return None
+    df['class'] = hit_class(df)
+    rates = {f"{col}%": float(df[col].to_numpy().mean() * 100) for col in ['DHH', *HIT_CLASSES]}
+    return {
+        'batter': int(batter),
+        'player_name': str(df['player_name'].iloc[0]),
+        'BBE': len(df),
+        'rates': rates,
+        'pitches': df[PITCH_COLUMNS],
+        'game_log': game_log(df),
+    }
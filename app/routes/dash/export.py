@@ -0,0 +1,97 @@
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Rows serialized per chunk of a streamed export
+EXPORT_CHUNK_ROWS = 2000
+
+# Export format -> (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+class _ChunkSink:
+    """
+    Write-only file object that hands back what was written since the last
+    drain, so a pyarrow writer's output can be streamed as it is produced.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _batches(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield pa.RecordBatch.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False)
+
+
+def stream_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield `df` as CSV text, the header first and then `chunk_rows` rows at
+    a time.
+    """
+    yield df.iloc[:0].to_csv(index=False)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False)
+
+
+def stream_arrow(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield `df` in the Arrow IPC streaming format, one record batch at a time.
+    """
+    sink = _ChunkSink()
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with ipc.new_stream(sink, schema) as writer:
+        for batch in _batches(df, chunk_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_parquet(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield `df` as a Parquet file with one row group per `chunk_rows` rows;
+    the footer follows the last row group.
+    """
+    sink = _ChunkSink()
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _batches(df, chunk_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMERS = {'csv': stream_csv, 'parquet': stream_parquet, 'arrow': stream_arrow}
+
+
+def stream_export(df, export_format, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Chunks of `df` serialized as `export_format` (see EXPORT_FORMATS).
+    """
+    return STREAMERS[export_format](df, chunk_rows)
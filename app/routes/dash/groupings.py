@@ -0,0 +1,142 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from .leaderboard import GROUPING_COLUMNS, GROUPING_STAT_COLUMNS, GROUPINGS
+
+
+class GroupingsMixin:
+    """
+    Pitcher and team leaderboards of DHHCalculator.process_groupings.
+    """
+
+    def grouping_columns(self, groupings, files):
+        """
+        Pitch columns `groupings` need beyond the base scan; ValueError if `files` lack them.
+        """
+        needed = list(dict.fromkeys(col for grouping in groupings for col in GROUPING_COLUMNS[grouping]))
+        if not needed:
+            return needed
+        con = duckdb.connect(database=':memory:')
+        try:
+            available = {row[0] for row in con.execute(
+                f"DESCRIBE SELECT * FROM read_parquet({files!r}, union_by_name = true)").fetchall()}
+        finally:
+            con.close()
+        missing = [col for col in needed if col not in available]
+        if missing:
+            unavailable = [grouping for grouping in groupings if set(GROUPING_COLUMNS[grouping]) & set(missing)]
+            raise ValueError(f"Groupings {unavailable} need the pitch columns {missing}, "
+                             f"which the pitch data does not have")
+        return needed
+
+    def calculate_groupings_sql(self, stdate, endate, groupings, quantiles='exact'):
+        """
+        One leaderboard per grouping from one GROUP BY GROUPING SETS query.
+        """
+        files = self.data_files(stdate, endate)
+        query, params = self.scan_query(stdate, endate, files=files,
+                                        extra_columns=self.grouping_columns(groupings, files))
+        key_columns = ', '.join(f"{GROUPINGS[grouping]} AS {grouping}_key" for grouping in groupings)
+        label = ' '.join(f"WHEN GROUPING({grouping}_key) = 0 THEN '{grouping}'" for grouping in groupings)
+        position = ' '.join(f"WHEN GROUPING({grouping}_key) = 0 THEN {i}" for i, grouping in enumerate(groupings))
+        key = ', '.join(f"CAST({grouping}_key AS VARCHAR)" for grouping in groupings)
+        player_name = ("CASE WHEN GROUPING(batter_key) = 0 THEN ANY_VALUE(player_name) END"
+                       if 'batter' in groupings else "NULL::VARCHAR")
+        grouping_query = f"""
+            WITH pitches AS (SELECT *, {key_columns} FROM ({query}))
+            SELECT
+                CASE {label} END AS grouping,
+                COALESCE({key}) AS key,
+                {player_name} AS player_name,
+                CASE {position} END AS position,
+                {self.leaderboard_aggregates_sql(quantiles)}
+            FROM pitches
+            GROUP BY GROUPING SETS ({', '.join(f'({grouping}_key)' for grouping in groupings)})
+            HAVING COALESCE({key}) IS NOT NULL
+        """
+        if quantiles == 'approx':
+            grouping_query = f"""
+                SELECT * EXCLUDE (ls_sketch),
+                       MAP_KEYS(ls_sketch) AS sketch_keys,
+                       MAP_VALUES(ls_sketch) AS sketch_counts
+                FROM ({grouping_query})
+            """
+        con = duckdb.connect(database=':memory:')
+        try:
+            grouped_df = con.execute(f"{grouping_query} ORDER BY position, key", params).df()
+        finally:
+            con.close()
+
+        if quantiles == 'approx':
+            grouped_df = self.add_sketch_quantiles(grouped_df)
+
+        return grouped_df[['grouping', 'key', 'player_name', *GROUPING_STAT_COLUMNS]]
+
+    def load_grouping_data(self, stdate, endate, groupings):
+        """
+        load_data with the extra pitch columns `groupings` need.
+        """
+        files = self.data_files(stdate, endate)
+        query, params = self.scan_query(stdate, endate, files=files,
+                                        extra_columns=self.grouping_columns(groupings, files))
+        con = duckdb.connect(database=':memory:')
+        try:
+            table = con.execute(query, params).arrow()
+        finally:
+            con.close()
+        return self.compact_pitches(table.to_pandas(strings_to_categorical=True, date_as_object=False))
+
+    def grouping_keys(self, df, grouping):
+        """
+        Key of each pitch under `grouping`, the pandas counterpart of GROUPINGS.
+        """
+        if grouping in ('batter', 'pitcher'):
+            return df[grouping]
+        top = (df['inning_topbot'] == 'Top').to_numpy()
+        batting, pitching = ('away_team', 'home_team') if grouping == 'batting_team' else ('home_team', 'away_team')
+        return pd.Series(np.where(top, df[batting].astype(object), df[pitching].astype(object)), index=df.index)
+
+    def calculate_dhh_groupings(self, df, groupings, quantiles='exact'):
+        """
+        calculate_dhh for each grouping of one classified pitch frame.
+        """
+        frames = []
+        for grouping in groupings:
+            if grouping == 'batter':
+                grouped_df = self.calculate_dhh(df, quantiles)
+                keys = grouped_df['batter'].astype(str)
+                names = grouped_df['player_name']
+            else:
+                # Group by the factorized key in place of the batter ID
+                codes, labels = pd.factorize(self.grouping_keys(df, grouping))
+                if labels.dtype.kind == 'f':
+                    labels = labels.astype('int64')
+                rows = codes >= 0
+                labels = np.asarray(labels.astype(str), dtype=object)
+                grouped_df = self.calculate_dhh(
+                    df[rows].assign(batter=codes[rows], player_name=pd.Categorical.from_codes(codes[rows], labels)),
+                    quantiles
+                )
+                keys = pd.Series(labels[grouped_df['batter'].to_numpy()], index=grouped_df.index)
+                names = None
+            grouped_df = grouped_df[GROUPING_STAT_COLUMNS].copy()
+            grouped_df.insert(0, 'grouping', grouping)
+            grouped_df.insert(1, 'key', keys)
+            grouped_df.insert(2, 'player_name', names)
+            frames.append(grouped_df.sort_values('key', kind='stable'))
+        return pd.concat(frames, ignore_index=True)
+
+    def name_groupings(self, df):
+        """
+        Replace the grouping columns with `Grouping`, `ID` and `Name`.
+        """
+        names = df['player_name'].astype(object)
+        pitchers = (df['grouping'] == 'pitcher').to_numpy()
+        if pitchers.any():
+            registry = self.player_registry().lookup(pd.to_numeric(df.loc[pitchers, 'key']))
+            names[pitchers] = registry['FANGRAPHSNAME'].to_numpy()
+        names = names.where(names.notna(), df['key'])
+        df = df.drop(columns=['player_name']).rename(columns={'grouping': 'Grouping', 'key': 'ID'})
+        df.insert(2, 'Name', names)
+        return df
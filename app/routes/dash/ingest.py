@@ -0,0 +1,161 @@
+import argparse
+import fcntl
+import glob
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date
+
+# Layout: <root>/game_date=YYYY-MM-DD/<file name>, one file per day
+PARTITION_PREFIX = 'game_date='
+PITCHES_FILE = 'pitches.parquet'
+ROLLUP_FILE = 'rollup.parquet'
+
+# Lock file, in the calculator's base directory, serializing dataset writes
+# across the worker processes sharing it
+LOCK_FILE = '.dataset.lock'
+
+
+def partition_file(root, day, file_name):
+    """
+    Path of the file holding one day of a partitioned dataset.
+    """
+    return os.path.join(root, f"{PARTITION_PREFIX}{day.isoformat()}", file_name)
+
+
+class DatasetLock:
+    """
+    Re-entrant lock serializing writes to a dataset directory between the
+    threads of this process and, through flock on a lock file in the
+    directory, between processes, so only one WSGI worker migrates the
+    legacy parquet or rebuilds the rollup while the others wait.
+
+    flock does not nest within a process (a second descriptor of the same
+    file blocks on the first), so the file is locked once, by the
+    outermost hold of a directory, and released when that hold ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._held = {}
+
+    @contextmanager
+    def hold(self, base_dir):
+        path = os.path.join(os.path.abspath(base_dir), LOCK_FILE)
+        with self._lock:
+            fd, depth = self._held.get(path, (None, 0))
+            if fd is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o664)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+            self._held[path] = (fd, depth + 1)
+            try:
+                yield
+            finally:
+                fd, depth = self._held.pop(path)
+                if depth > 1:
+                    self._held[path] = (fd, depth - 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+
+
+# Held while the pitch partitions or the rollup are written: by one thread
+# of one worker process at a time
+dataset_lock = DatasetLock()
+
+
+def list_partitions(root, file_name, stdate=None, endate=None):
+    """
+    Map each partition day in [stdate, endate] to its file, in day order.
+    Partitions outside the window are pruned from the directory names
+    alone, without opening any file.
+    """
+    partitions = {}
+    if not os.path.isdir(root):
+        return partitions
+    for entry in sorted(os.listdir(root)):
+        if not entry.startswith(PARTITION_PREFIX):
+            continue
+        try:
+            day = date.fromisoformat(entry[len(PARTITION_PREFIX):])
+        except ValueError:
+            continue
+        if (stdate is not None and day < stdate) or (endate is not None and day > endate):
+            continue
+        path = os.path.join(root, entry, file_name)
+        if os.path.exists(path):
+            partitions[day] = path
+    return partitions
+
+
+def write_partitions(con, query, params, root, file_name):
+    """
+    Write the rows of `query` as one file per game_date under `root`.
+
+    The query is copied once into a staging directory, partitioned by day,
+    and each day's file then replaces the published one with os.replace.
+    Re-writing a day is therefore atomic for readers and idempotent.
+    Returns the days written.
+    """
+    staging = os.path.join(root, f".staging-{uuid.uuid4().hex}")
+    os.makedirs(root, exist_ok=True)
+    try:
+        con.execute(f"""
+            COPY (
+                SELECT *, strftime(CAST(game_date AS DATE), '%Y-%m-%d') AS partition_day
+                FROM ({query})
+            ) TO '{staging}' (FORMAT PARQUET, PARTITION_BY (partition_day))
+        """, params)
+
+        days = []
+        for staged_dir in sorted(glob.glob(os.path.join(staging, 'partition_day=*'))):
+            day = date.fromisoformat(staged_dir.rsplit('=', 1)[1])
+            staged_files = glob.glob(os.path.join(staged_dir, '*.parquet'))
+            if len(staged_files) != 1:
+                raise RuntimeError(f"Expected one staged file for {day}, found {len(staged_files)}")
+            target = partition_file(root, day, file_name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(staged_files[0], target)
+            days.append(day)
+        return days
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def source_query(source):
+    """
+    SQL reading a pitch export: a parquet or CSV path, or the name of a
+    DataFrame registered on the connection.
+    """
+    if source.endswith('.parquet'):
+        return f"SELECT * FROM read_parquet('{source}')"
+    if source.endswith('.csv'):
+        return f"SELECT * FROM read_csv_auto('{source}')"
+    return f"SELECT * FROM {source}"
+
+
+def main(argv=None):
+    """
+    Nightly entry point: ingest one or more Statcast exports.
+    """
+    parser = argparse.ArgumentParser(description="Ingest Statcast pitch exports into the date-partitioned dataset.")
+    parser.add_argument('sources', nargs='+', help="Parquet or CSV files of pitch-level Statcast data")
+    args = parser.parse_args(argv)
+
+    from .utils import default_calculator
+
+    dhh_calculator = default_calculator()
+    for source in args.sources:
+        days = dhh_calculator.ingest(source)
+        print(f"Ingested {len(days)} day(s) from {source}")
+
+
+if __name__ == '__main__':
+    main()
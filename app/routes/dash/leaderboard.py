@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Engines and quantile modes accepted by DHHCalculator.process
+ENGINES = ('pandas', 'sql', 'rollup', 'parallel')
+QUANTILE_MODES = ('exact', 'approx')
+
+# Period granularities accepted by DHHCalculator.process_periods
+PERIOD_GRANULARITIES = ('half', 'month', 'week')
+
+# Leaderboard groupings of DHHCalculator.process_groupings: the SQL key of
+# each, the pitch columns it needs beyond the base scan, and the engines
+# that compute several of them from one scan
+GROUPINGS = {
+    'batter': 'batter',
+    'pitcher': 'pitcher',
+    'batting_team': "CASE WHEN inning_topbot = 'Top' THEN away_team ELSE home_team END",
+    'pitching_team': "CASE WHEN inning_topbot = 'Top' THEN home_team ELSE away_team END",
+}
+GROUPING_COLUMNS = {
+    'batter': (),
+    'pitcher': ('pitcher',),
+    'batting_team': ('inning_topbot', 'home_team', 'away_team'),
+    'pitching_team': ('inning_topbot', 'home_team', 'away_team'),
+}
+GROUPING_ENGINES = ('pandas', 'sql')
+
+# Final leaderboard columns, in display order
+LEADERBOARD_COLUMNS = [
+    'player_name', 'batter', 'BBE', 'DHH%', 'Sd(LA)', 'LA',
+    'Barrel%', 'MaxEV', 'P95 EV', 'P90 EV', 'P50 EV', 'EV',
+    'AVG Pitches Velo', 'AVG Hit Distance', 'Solid-Contact%',
+    'Poorly-Weak%', 'Flare-or-Burner%', 'Poorly-Under%', 'Poorly-Topped%'
+]
+
+# Leaderboard columns of every grouping, after its Grouping, ID and Name
+GROUPING_STAT_COLUMNS = [col for col in LEADERBOARD_COLUMNS if col not in ('player_name', 'batter')]
+
+# SQL counterparts of the masks built in calculate_missing_columns
+CLASSIFICATION_SQL = {
+    'Barrel': """
+        launch_speed * 1.5 - launch_angle >= 117 AND launch_speed + launch_angle >= 124
+        AND launch_speed >= 98 AND launch_angle BETWEEN 4 AND 50""",
+    'Solid-Contact': """
+        launch_speed * 1.5 - launch_angle >= 111 AND launch_speed + launch_angle >= 119
+        AND launch_speed >= 95 AND launch_angle BETWEEN 0 AND 52""",
+    'Poorly-Weak': "launch_speed <= 59",
+    'Flare-or-Burner': """
+        (launch_speed * 2 - launch_angle >= 87 AND launch_angle <= 41
+         AND launch_speed * 2 + launch_angle <= 175 AND launch_speed + launch_angle * 1.3 >= 89
+         AND launch_speed BETWEEN 59 AND 72)
+        OR (launch_speed + launch_angle * 1.3 <= 112 AND launch_speed + launch_angle * 1.55 >= 92
+            AND launch_speed BETWEEN 72 AND 86)
+        OR (launch_angle <= 20 AND launch_speed + launch_angle * 2.4 >= 98
+            AND launch_speed BETWEEN 86 AND 95)
+        OR (launch_speed - launch_angle >= 76 AND launch_speed + launch_angle * 2.4 >= 98
+            AND launch_speed >= 95 AND launch_angle <= 30)""",
+    'Poorly-Under': "launch_speed + launch_angle * 2 >= 116",
+    'Poorly-Topped': "launch_speed + launch_angle * 2 <= 116",
+}
+CLASSIFICATION_SQL['Unclassified'] = "NOT ({})".format(
+    ' OR '.join(f"({condition})" for condition in CLASSIFICATION_SQL.values())
+)
+DHH_SQL = "launch_speed > -0.0049 * pow(launch_angle, 2) + 0.0853 * launch_angle + 105.05"
+
+# Flags reported as percentages on the leaderboard
+LEADERBOARD_FLAGS_SQL = {
+    'DHH': DHH_SQL,
+    'Barrel': CLASSIFICATION_SQL['Barrel'],
+    'Solid-Contact': CLASSIFICATION_SQL['Solid-Contact'],
+    'Poorly-Weak': CLASSIFICATION_SQL['Poorly-Weak'],
+    'Flare-or-Burner': CLASSIFICATION_SQL['Flare-or-Burner'],
+    'Poorly-Under': CLASSIFICATION_SQL['Poorly-Under'],
+    'Poorly-Topped': CLASSIFICATION_SQL['Poorly-Topped'],
+}
+
+# Rollup column holding the daily count for each leaderboard flag
+ROLLUP_FLAG_COLUMNS = {
+    'DHH': 'dhh',
+    'Barrel': 'barrel',
+    'Solid-Contact': 'solid_contact',
+    'Poorly-Weak': 'poorly_weak',
+    'Flare-or-Burner': 'flare_or_burner',
+    'Poorly-Under': 'poorly_under',
+    'Poorly-Topped': 'poorly_topped',
+}
+
+# Leaderboard EV quantile columns
+EV_QUANTILES = {'P95 EV': 0.95, 'P90 EV': 0.9, 'P50 EV': 0.5}
+
+# Compact dtypes of the pitch-level frame the pandas engine works on.
+# launch_speed/launch_angle stay float64 so the classification thresholds
+# see exactly the values the SQL engines compare.
+PITCH_DTYPES = {
+    'batter': 'int32',
+    'release_speed': 'float32',
+    'hit_distance_sc': 'float32',
+}
+
+
+def grouped_quantiles(group, values, groups, quantiles):
+    """
+    Interpolated quantiles of `values` per group id in [0, groups), NaN for empty groups.
+    """
+    if not len(values):
+        return [np.full(groups, np.nan) for _ in quantiles]
+    order = np.lexsort((values, group))
+    values = np.asarray(values, dtype=np.float64)[order]
+    sizes = np.bincount(group, minlength=groups)
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    estimates = []
+    for q in quantiles:
+        position = (sizes - 1) * q
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, sizes - 1)
+        # Empty groups index a neighbour's values; their estimate is dropped
+        low_values = values[np.minimum(starts + np.maximum(lower, 0), len(values) - 1)]
+        high_values = values[np.minimum(starts + np.maximum(upper, 0), len(values) - 1)]
+        estimate = low_values + (high_values - low_values) * (position - lower)
+        estimates.append(np.where(sizes > 0, estimate, np.nan))
+    return estimates
+
+
+def as_date(value):
+    """
+    Normalize a Dash/ISO date string or datetime to a date (None passes through).
+    """
+    return None if value is None else pd.to_datetime(value).date()
+
+
+def period_ranges(stdate, endate, granularity):
+    """
+    Split [stdate, endate] into (label, stdate, endate) halves, months or ISO weeks.
+    """
+    if granularity not in PERIOD_GRANULARITIES:
+        raise ValueError(f"Unknown period granularity '{granularity}', expected one of {PERIOD_GRANULARITIES}")
+    stdate, endate = as_date(stdate), as_date(endate)
+    if stdate > endate:
+        raise ValueError("Period start must not be after its end")
+
+    if granularity == 'half':
+        middle = stdate + (endate - stdate) // 2
+        periods = [('1st half', stdate, middle), ('2nd half', middle + timedelta(days=1), endate)]
+        return [period for period in periods if period[1] <= period[2]]
+
+    periods, start = [], stdate
+    while start <= endate:
+        if granularity == 'month':
+            label = f"{start:%Y-%m}"
+            following = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        else:
+            year, week, _ = start.isocalendar()
+            label = f"{year}-W{week:02d}"
+            following = start + timedelta(days=7 - start.weekday())
+        periods.append((label, start, min(endate, following - timedelta(days=1))))
+        start = following
+    return periods
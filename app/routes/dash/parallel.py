@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .ingest import PITCHES_FILE, list_partitions
+from .leaderboard import EV_QUANTILES, LEADERBOARD_COLUMNS, ROLLUP_FLAG_COLUMNS, as_date, grouped_quantiles
+from .sketch import QuantileSketch
+
+# Process pools of the parallel engine, one per worker count. Workers are
+# spawned, not forked: the parent runs request and DuckDB threads.
+# Each task classifies and partially aggregates one run of day partitions.
+_shard_pools = {}
+_shard_pools_lock = threading.Lock()
+
+# Calculators of the parallel engine's tasks, reused across the tasks a
+# process runs, by constructor arguments
+_shard_calculators = {}
+
+# How partial_dhh columns combine across shards
+PARTIAL_AGGREGATIONS = {
+    'BBE': 'sum', **{col: 'sum' for col in ROLLUP_FLAG_COLUMNS},
+    'la_sum': 'sum', 'la_sumsq': 'sum', 'ls_sum': 'sum', 'ls_max': 'max',
+    'release_speed_sum': 'sum', 'release_speed_n': 'sum', 'hit_distance_sum': 'sum', 'hit_distance_n': 'sum',
+}
+
+
+def shard_pool(workers):
+    """
+    The process-wide pool of `workers` processes used by the parallel engine.
+    """
+    with _shard_pools_lock:
+        pool = _shard_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _shard_pools[workers] = pool
+        return pool
+
+
+def aggregate_shard(calculator_args, stdate, endate, quantiles, periods=None):
+    """
+    Pool task of the parallel engine: partial_dhh of one shard's days.
+    """
+    from .utils import DHHCalculator
+    calculator = _shard_calculators.get(calculator_args)
+    if calculator is None:
+        # Shards scan their own partitions: a shared store would build the
+        # whole pitch snapshot, and the parent already prepared base_dir
+        calculator = DHHCalculator(*calculator_args, shared_store=False, prepare_dirs=False)
+        # One DuckDB thread per worker; the pool already occupies every CPU
+        calculator.scan_threads = 1
+        _shard_calculators[calculator_args] = calculator
+    data = calculator.load_data(stdate, endate)
+    data = calculator.calculate_missing_columns(data)
+    data = calculator.filter_data(data, stdate, endate, 0)
+    if periods:
+        data = calculator.tag_periods(data, periods)
+    return calculator.partial_dhh(data, quantiles, ('period',) if periods else ())
+
+
+class ParallelMixin:
+    """
+    engine='parallel' of DHHCalculator: the pandas pipeline over a process pool.
+    """
+
+    def shard_windows(self, stdate, endate, shards):
+        """
+        Split [stdate, endate] into at most `shards` runs of days of about equal size.
+        """
+        self.ensure_dataset()
+        partitions = list_partitions(self.dataset_dir, PITCHES_FILE, as_date(stdate), as_date(endate))
+        if not partitions:
+            return [(as_date(stdate), as_date(endate))]
+        days = list(partitions)
+        weights = np.cumsum([os.path.getsize(path) for path in partitions.values()])
+        # Day index at which each shard's share of the bytes is reached
+        cuts = np.searchsorted(weights, weights[-1] * np.arange(1, shards) / shards, side='left')
+        bounds = sorted({0, *(int(cut) + 1 for cut in cuts), len(days)})
+        return [(days[lo], days[hi - 1]) for lo, hi in zip(bounds, bounds[1:])]
+
+    def tag_periods(self, df, periods):
+        """
+        Rows of a filtered pitch frame with the index of each period containing them.
+        """
+        game_days = df['game_date'].dt.normalize()
+        frames = [
+            df[(game_days >= pd.Timestamp(stdate)) & (game_days <= pd.Timestamp(endate))].assign(period=i)
+            for i, (_, stdate, endate) in enumerate(periods)
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    def partial_dhh(self, df, quantiles='exact', keys=()):
+        """
+        Mergeable per-player partials of a filtered pitch frame (see merge_partials).
+        """
+        keys = [*keys, 'player_name', 'batter']
+        ls = df['launch_speed'].astype('float64')
+        la = df['launch_angle'].astype('float64')
+        release_speed = df['release_speed'].astype('float64')
+        hit_distance = df['hit_distance_sc'].astype('float64')
+        parts = df[[*keys, 'BBE', *ROLLUP_FLAG_COLUMNS]].assign(
+            la_sum=la, la_sumsq=la * la, ls_sum=ls, ls_max=ls,
+            release_speed_sum=release_speed, release_speed_n=release_speed.notna(),
+            hit_distance_sum=hit_distance, hit_distance_n=hit_distance.notna(),
+        )
+        totals = parts.groupby(keys, observed=True).agg(PARTIAL_AGGREGATIONS).reset_index()
+
+        if quantiles == 'exact':
+            values = df[keys].assign(launch_speed=ls)
+        else:
+            values = (
+                df[keys].assign(sketch_keys=QuantileSketch.keys_for(ls))
+                .groupby([*keys, 'sketch_keys'], observed=True).size().rename('sketch_counts')
+                .reset_index()
+            )
+        return totals, values
+
+    def merge_partials(self, partials, quantiles='exact', keys=()):
+        """
+        Combine partial_dhh results into the leaderboard columns of calculate_dhh.
+        """
+        group_keys = [*keys, 'player_name', 'batter']
+        totals = self._concat_partials([part for part, _ in partials])
+        values = self._concat_partials([part for _, part in partials])
+        totals = totals.groupby(group_keys, sort=True, observed=True).agg(PARTIAL_AGGREGATIONS).reset_index()
+
+        bbe = totals['BBE'].astype('int64')
+        grouped_df = totals[group_keys].assign(BBE=bbe)
+        for col in ROLLUP_FLAG_COLUMNS:
+            grouped_df[f'{col}%'] = totals[col] / bbe * 100
+        variance = (totals['la_sumsq'] - totals['la_sum'] ** 2 / bbe).clip(lower=0) / (bbe - 1)
+        grouped_df['Sd(LA)'] = np.sqrt(variance).where(bbe > 1)
+        grouped_df['LA'] = totals['la_sum'] / bbe
+        grouped_df['MaxEV'] = totals['ls_max']
+        grouped_df['EV'] = totals['ls_sum'] / bbe
+        grouped_df['AVG Pitches Velo'] = totals['release_speed_sum'] / totals['release_speed_n'].where(
+            totals['release_speed_n'] > 0)
+        grouped_df['AVG Hit Distance'] = totals['hit_distance_sum'] / totals['hit_distance_n'].where(
+            totals['hit_distance_n'] > 0)
+
+        if quantiles == 'exact':
+            # Group ids follow the sorted keys, i.e. the rows of grouped_df
+            group = values.groupby(group_keys, sort=True, observed=True).ngroup().to_numpy()
+            estimates = grouped_quantiles(group, values['launch_speed'].to_numpy(), len(grouped_df),
+                                          EV_QUANTILES.values())
+            for col, estimate in zip(EV_QUANTILES, estimates):
+                grouped_df[col] = estimate
+        else:
+            sketches = (
+                values.groupby([*group_keys, 'sketch_keys'], sort=True, observed=True)['sketch_counts'].sum()
+                .reset_index(level='sketch_keys')
+                .groupby(level=group_keys, sort=True, observed=True).agg(list)
+                .reset_index()
+            )
+            grouped_df = self.add_sketch_quantiles(grouped_df.merge(sketches, on=group_keys, how='left'))
+
+        grouped_df = grouped_df.astype({'player_name': object, 'batter': 'int64'})
+        return grouped_df[[*keys, *LEADERBOARD_COLUMNS]]
+
+    def _concat_partials(self, frames):
+        """
+        Stack partial frames, unioning the player_name categories in sorted order.
+        """
+        names = union_categoricals([frame['player_name'] for frame in frames], sort_categories=True)
+        stacked = pd.concat([frame.drop(columns=['player_name']) for frame in frames], ignore_index=True)
+        stacked['player_name'] = names
+        return stacked
+
+    def calculate_dhh_parallel(self, stdate, endate, quantiles='exact', periods=None):
+        """
+        The pandas pipeline over a pool of `workers` processes, one shard of days each.
+        """
+        keys = ('period',) if periods else ()
+        windows = self.shard_windows(stdate, endate, self.workers)
+        if len(windows) == 1:
+            partials = [aggregate_shard(self._init_args, *windows[0], quantiles, periods)]
+        else:
+            pool = shard_pool(self.workers)
+            futures = [pool.submit(aggregate_shard, self._init_args, shard_start, shard_end, quantiles, periods)
+                       for shard_start, shard_end in windows]
+            try:
+                partials = [future.result() for future in futures]
+            except BrokenProcessPool:
+                # A worker died; the next call starts a fresh pool
+                with _shard_pools_lock:
+                    if _shard_pools.get(self.workers) is pool:
+                        del _shard_pools[self.workers]
+                raise
+        return self.merge_partials(partials, quantiles, keys)
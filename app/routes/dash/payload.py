@@ -0,0 +1,42 @@
+# Browser-side counterpart of columnar(): expands {columns, values} back into
+# the row records a DataTable takes, without a server round-trip
+RECORDS_JS = """
+function(payload) {
+    if (!payload || !payload.columns.length) {
+        return [];
+    }
+    const columns = payload.columns, values = payload.values;
+    const rows = new Array(values[0].length);
+    for (let i = 0; i < rows.length; i++) {
+        const row = {};
+        for (let j = 0; j < columns.length; j++) {
+            row[columns[j]] = values[j][i];
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+"""
+
+
+def columnar(df, decimals=2, precision=None):
+    """
+    A frame as {'columns': [...], 'values': [[...], ...]}, one array per
+    column instead of one object per row, so column names are sent once.
+    Float columns are rounded to their display precision (`precision`
+    maps column -> decimals, `decimals` is the default) and NaN is sent as
+    null. Expanded into records in the browser by RECORDS_JS.
+    """
+    import numpy as np
+    precision = precision or {}
+    values = []
+    for col in df.columns:
+        column = df[col].to_numpy()
+        if column.dtype.kind == 'f':
+            rounded = np.round(column, precision.get(col, decimals))
+            values.append([None if value != value else value for value in rounded.tolist()])
+        elif column.dtype.kind == 'M':
+            values.append(np.datetime_as_string(column, unit='D').tolist())
+        else:
+            values.append(column.tolist())
+    return {'columns': [str(col) for col in df.columns], 'values': values}
@@ -0,0 +1,136 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a failed download
+BOOTSTRAP_RETRY_SECONDS = 60
+
+# Columns of the player-ID sheet the leaderboards use, MLBID first
+REGISTRY_COLUMNS = ['MLBID', 'FANGRAPHSNAME', 'IDFANGRAPHS', 'IDPLAYER', 'MLBNAME', 'BREFID', 'TEAM', 'POS']
+
+
+class PlayerRegistry:
+    """
+    MLBID-indexed player IDs, loaded once from the SQLite copy of the
+    player-ID sheet and reloaded only when the database file changes.
+
+    Lookups are a vectorized reindex on MLBID. When the database does not
+    exist yet, the sheet is downloaded on a background thread and lookups
+    return empty IDs until it is in place; the request thread never waits
+    on the download.
+    """
+
+    def __init__(self, db_file_name, table_name, google_sheet_url, on_created=None):
+        self.db_file_name = db_file_name
+        self.table_name = table_name
+        self.google_sheet_url = google_sheet_url
+        self.on_created = on_created
+        self._frame = pd.DataFrame(columns=REGISTRY_COLUMNS[1:], index=pd.Index([], name='MLBID', dtype='float64'))
+        self._signature = None
+        self._lock = threading.Lock()
+        self._bootstrap = None
+        self._retry_at = 0.0
+
+    def _db_signature(self):
+        try:
+            st = os.stat(self.db_file_name)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def frame(self):
+        """
+        The registry as a DataFrame indexed by MLBID, reloaded if the
+        database file changed since the last load.
+        """
+        signature = self._db_signature()
+        if signature is None:
+            self.start_bootstrap()
+            return self._frame
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._frame = self._load()
+                    self._signature = signature
+        return self._frame
+
+    def _load(self):
+        # Read-only: writing here would change the file's mtime, which is
+        # part of the data version every cached leaderboard is keyed on
+        conn = sqlite3.connect(f"file:{self.db_file_name}?mode=ro", uri=True)
+        try:
+            player_id_df = pd.read_sql(
+                f"SELECT {', '.join(REGISTRY_COLUMNS)} FROM {self.table_name} WHERE MLBID IS NOT NULL",
+                conn
+            )
+        finally:
+            conn.close()
+        player_id_df['MLBID'] = player_id_df['MLBID'].astype('float64')
+        player_id_df = player_id_df.drop_duplicates('MLBID')
+        return player_id_df.set_index('MLBID')
+
+    def lookup(self, mlbids):
+        """
+        Registry rows aligned with `mlbids`, with NaN for unknown players.
+        """
+        return self.frame().reindex(pd.Index(mlbids, dtype='float64'))
+
+    def start_bootstrap(self):
+        """
+        Download the player-ID sheet in the background. At most one download
+        runs at a time, and a failed one is retried after a pause.
+        """
+        with self._lock:
+            running = self._bootstrap is not None and self._bootstrap.is_alive()
+            if not running and time.monotonic() >= self._retry_at:
+                self._bootstrap = threading.Thread(target=self._run_bootstrap, name='player-registry-bootstrap',
+                                                   daemon=True)
+                self._bootstrap.start()
+            return self._bootstrap
+
+    def _run_bootstrap(self):
+        # Build the database beside its final path and rename it into place,
+        # so readers never see a partial table
+        token = uuid.uuid4().hex
+        csv_path = f"{self.db_file_name}.{token}.csv"
+        tmp_path = f"{self.db_file_name}.{token}.tmp"
+        try:
+            import gdown  # Only needed for the download; it pulls in requests and bs4
+            gdown.download(self.google_sheet_url, csv_path, quiet=True)
+            player_id_df = pd.read_csv(csv_path)
+            with sqlite3.connect(tmp_path) as conn:
+                player_id_df.to_sql(self.table_name, conn, index=False)
+                conn.execute(f"CREATE INDEX idx_{self.table_name}_mlbid ON {self.table_name} (MLBID)")
+            conn.close()
+            os.replace(tmp_path, self.db_file_name)
+            if self.on_created is not None:
+                self.on_created(self.db_file_name)
+        except Exception as e:
+            self._retry_at = time.monotonic() + BOOTSTRAP_RETRY_SECONDS
+            logger.error("Error bootstrapping player IDs into %s: %s", self.db_file_name, e)
+        finally:
+            for path in (csv_path, tmp_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def player_registry(db_file_name, table_name, google_sheet_url, on_created=None):
+    """
+    The process-wide registry for a database file.
+    """
+    key = (db_file_name, table_name)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = PlayerRegistry(db_file_name, table_name, google_sheet_url, on_created)
+        return _registries[key]
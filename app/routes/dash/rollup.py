@@ -0,0 +1,155 @@
+import os
+
+import duckdb
+import numpy as np
+import pyarrow.compute as pc
+
+from .ingest import PITCHES_FILE, ROLLUP_FILE, dataset_lock, list_partitions, write_partitions
+from .leaderboard import (EV_QUANTILES, LEADERBOARD_COLUMNS, LEADERBOARD_FLAGS_SQL, ROLLUP_FLAG_COLUMNS, as_date,
+                          grouped_quantiles)
+from .sketch import grouped_sketch_quantiles, sketch_key_sql
+
+
+class RollupMixin:
+    """
+    engine='rollup' of DHHCalculator: merges the per-(batter, game_date) rollup.
+    """
+
+    def build_rollup(self, days=None):
+        """
+        Materialize the (batter, game_date) rollup for `days` (all by default).
+        """
+        pitch_partitions = list_partitions(self.dataset_dir, PITCHES_FILE)
+        if days is not None:
+            pitch_partitions = {day: pitch_partitions[day] for day in days if day in pitch_partitions}
+        if not pitch_partitions:
+            return []
+
+        query, params = self.scan_query(files=list(pitch_partitions.values()))
+        flag_columns = ',\n'.join(
+            f"SUM(CASE WHEN {LEADERBOARD_FLAGS_SQL[col]} THEN 1 ELSE 0 END)::INTEGER AS {name}"
+            for col, name in ROLLUP_FLAG_COLUMNS.items()
+        )
+        rollup_query = f"""
+            WITH pitches AS ({query})
+            SELECT
+                player_name,
+                batter,
+                CAST(game_date AS DATE) AS game_date,
+                COUNT(*)::INTEGER AS bbe,
+                {flag_columns},
+                SUM(launch_angle) AS la_sum,
+                SUM(launch_angle * launch_angle) AS la_sumsq,
+                SUM(launch_speed) AS ls_sum,
+                MAX(launch_speed) AS ls_max,
+                LIST(launch_speed ORDER BY launch_speed) AS ls_values,
+                HISTOGRAM({sketch_key_sql('launch_speed')}) AS ls_sketch,
+                SUM(TRY_CAST(release_speed AS DOUBLE)) AS release_speed_sum,
+                COUNT(TRY_CAST(release_speed AS DOUBLE))::INTEGER AS release_speed_n,
+                SUM(TRY_CAST(hit_distance_sc AS DOUBLE)) AS hit_distance_sum,
+                COUNT(TRY_CAST(hit_distance_sc AS DOUBLE))::INTEGER AS hit_distance_n
+            FROM pitches
+            WHERE player_name IS NOT NULL AND batter IS NOT NULL
+            GROUP BY player_name, batter, CAST(game_date AS DATE)
+            ORDER BY game_date, batter
+        """
+        rollup_query = f"""
+            SELECT * EXCLUDE (ls_sketch),
+                   MAP_KEYS(ls_sketch) AS sketch_keys,
+                   MAP_VALUES(ls_sketch)::INTEGER[] AS sketch_counts
+            FROM ({rollup_query})
+        """
+        con = duckdb.connect(database=':memory:')
+        try:
+            with dataset_lock.hold(self.base_dir):
+                written = write_partitions(con, rollup_query, params, self.rollup_dir, ROLLUP_FILE)
+        finally:
+            con.close()
+
+        self.set_permissions(self.rollup_dir)
+        return written
+
+    def stale_rollup_days(self):
+        """
+        Days whose rollup partition is missing or older than the pitch partition.
+        """
+        self.ensure_dataset()
+        rollups = list_partitions(self.rollup_dir, ROLLUP_FILE)
+        return [
+            day for day, path in list_partitions(self.dataset_dir, PITCHES_FILE).items()
+            if day not in rollups or os.path.getmtime(rollups[day]) < os.path.getmtime(path)
+        ]
+
+    def ensure_rollup(self):
+        """
+        Rebuild the rollup for any day that is missing or stale.
+        """
+        if self.stale_rollup_days():
+            with dataset_lock.hold(self.base_dir):
+                stale_days = self.stale_rollup_days()
+                if stale_days:
+                    self.build_rollup(stale_days)
+
+    def calculate_dhh_rollup(self, stdate, endate, quantiles='exact', periods=None):
+        """
+        Answer a date range by merging the daily rollup rows.
+        """
+        keys = ('period',) if periods else ()
+        group_columns = ', '.join([*keys, 'player_name', 'batter'])
+        self.ensure_rollup()
+        rollup_files = self.window_files(self.rollup_dir, ROLLUP_FILE, stdate, endate)
+        # Exact quantiles merge every EV value in range; approx ones merge fixed-size sketches
+        ev_columns = ['ls_values'] if quantiles == 'exact' else ['sketch_keys', 'sketch_counts']
+        ev_summary = ''.join(f',\nFLATTEN(LIST({col})) AS {col}' for col in ev_columns)
+        flag_columns = ',\n'.join(
+            f'SUM({name})::DOUBLE / SUM(bbe) * 100 AS "{col}%"'
+            for col, name in ROLLUP_FLAG_COLUMNS.items()
+        )
+        day_columns = ['player_name', 'batter', 'game_date', 'bbe', *ROLLUP_FLAG_COLUMNS.values(), 'la_sum',
+                       'la_sumsq', 'ls_sum', 'ls_max', 'release_speed_sum', 'release_speed_n', 'hit_distance_sum',
+                       'hit_distance_n', *ev_columns]
+        days_query = f"""
+            SELECT {', '.join(day_columns)}
+            FROM read_parquet({rollup_files!r})
+            WHERE game_date >= ? AND game_date <= ?
+        """
+        params = [as_date(stdate), as_date(endate)]
+        if periods:
+            days_query, period_params = self.tag_periods_sql(days_query, periods)
+            params += period_params
+        leaderboard_query = f"""
+            WITH days AS ({days_query})
+            SELECT
+                {group_columns},
+                SUM(bbe)::BIGINT AS BBE,
+                {flag_columns},
+                CASE WHEN SUM(bbe) > 1 THEN
+                    SQRT(GREATEST(SUM(la_sumsq) - SUM(la_sum) * SUM(la_sum) / SUM(bbe), 0) / (SUM(bbe) - 1))
+                END AS "Sd(LA)",
+                SUM(la_sum) / SUM(bbe) AS LA,
+                MAX(ls_max) AS MaxEV,
+                SUM(ls_sum) / SUM(bbe) AS EV,
+                SUM(release_speed_sum) / NULLIF(SUM(release_speed_n), 0) AS "AVG Pitches Velo",
+                SUM(hit_distance_sum) / NULLIF(SUM(hit_distance_n), 0) AS "AVG Hit Distance"{ev_summary}
+            FROM days
+            GROUP BY {group_columns}
+            ORDER BY {group_columns}
+        """
+        con = duckdb.connect(database=':memory:')
+        try:
+            totals = con.execute(leaderboard_query, params).arrow()
+        finally:
+            con.close()
+
+        grouped_df = totals.drop_columns(ev_columns).to_pandas()
+        ev_lists = [totals.column(col).combine_chunks() for col in ev_columns]
+        group = np.repeat(np.arange(len(grouped_df)), pc.list_value_length(ev_lists[0]).fill_null(0).to_numpy())
+        ev_values = [ev_list.flatten().to_numpy() for ev_list in ev_lists]
+        if quantiles == 'exact':
+            estimates = grouped_quantiles(group, *ev_values, len(grouped_df), EV_QUANTILES.values())
+        else:
+            estimates = grouped_sketch_quantiles(group, *ev_values, len(grouped_df), EV_QUANTILES.values())
+        for col, estimate in zip(EV_QUANTILES, estimates):
+            grouped_df[col] = estimate
+
+        return grouped_df[[*keys, *LEADERBOARD_COLUMNS]]
@@ -0,0 +1,96 @@
+import duckdb
+
+from .leaderboard import LEADERBOARD_COLUMNS, LEADERBOARD_FLAGS_SQL
+from .sketch import sketch_key_sql
+
+
+class SqlEngineMixin:
+    """
+    engine='sql' of DHHCalculator: the leaderboard as one DuckDB aggregation.
+    """
+
+    def tag_periods_sql(self, query, periods):
+        """
+        Add the index of each period containing a row of `query` as a `period` column.
+        """
+        values = ', '.join(['(?::INTEGER, ?::DATE, ?::DATE)'] * len(periods))
+        params = [value for i, (_, stdate, endate) in enumerate(periods) for value in (i, stdate, endate)]
+        tagged_query = f"""
+            SELECT periods.period, tagged.*
+            FROM ({query}) AS tagged
+            JOIN (VALUES {values}) AS periods(period, stdate, endate)
+              ON CAST(tagged.game_date AS DATE) BETWEEN periods.stdate AND periods.endate
+        """
+        return tagged_query, params
+
+    def leaderboard_aggregates_sql(self, quantiles='exact'):
+        """
+        Select list of the leaderboard aggregates over a group of pitches.
+        """
+        if quantiles == 'exact':
+            quantile_columns = """
+                QUANTILE_CONT(launch_speed, 0.95) AS "P95 EV",
+                QUANTILE_CONT(launch_speed, 0.9) AS "P90 EV",
+                QUANTILE_CONT(launch_speed, 0.5) AS "P50 EV","""
+        else:
+            quantile_columns = f"""
+                HISTOGRAM({sketch_key_sql('launch_speed')}) AS ls_sketch,"""
+        flag_columns = ',\n'.join(
+            f'SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)::DOUBLE / COUNT(*) * 100 AS "{col}%"'
+            for col, condition in LEADERBOARD_FLAGS_SQL.items()
+        )
+        return f"""
+                COUNT(*) AS BBE,
+                {flag_columns},
+                STDDEV_SAMP(launch_angle) AS "Sd(LA)",
+                AVG(launch_angle) AS LA,
+                MAX(launch_speed) AS MaxEV,{quantile_columns}
+                AVG(launch_speed) AS EV,
+                AVG(TRY_CAST(release_speed AS DOUBLE)) AS "AVG Pitches Velo",
+                AVG(TRY_CAST(hit_distance_sc AS DOUBLE)) AS "AVG Hit Distance"
+        """
+
+    def leaderboard_sql(self, query, quantiles='exact', keys=()):
+        """
+        Aggregate the pitches returned by `query` into the leaderboard, per `keys` and player.
+        """
+        group_columns = ', '.join([*keys, 'player_name', 'batter'])
+        leaderboard_query = f"""
+            WITH pitches AS ({query})
+            SELECT
+                {group_columns},
+                {self.leaderboard_aggregates_sql(quantiles)}
+            FROM pitches
+            WHERE player_name IS NOT NULL AND batter IS NOT NULL
+            GROUP BY {group_columns}
+            ORDER BY {group_columns}
+        """
+        if quantiles == 'approx':
+            leaderboard_query = f"""
+                SELECT * EXCLUDE (ls_sketch),
+                       MAP_KEYS(ls_sketch) AS sketch_keys,
+                       MAP_VALUES(ls_sketch) AS sketch_counts
+                FROM ({leaderboard_query})
+                ORDER BY {group_columns}
+            """
+        return leaderboard_query
+
+    def calculate_dhh_sql(self, stdate, endate, quantiles='exact', periods=None):
+        """
+        Single-pass DuckDB equivalent of calculate_missing_columns, filter_data and calculate_dhh.
+        """
+        keys = ('period',) if periods else ()
+        con = duckdb.connect(database=':memory:')
+        try:
+            query, params = self.open_scan(con, stdate, endate)
+            if periods:
+                query, period_params = self.tag_periods_sql(query, periods)
+                params = params + period_params
+            grouped_df = con.execute(self.leaderboard_sql(query, quantiles, keys), params).df()
+        finally:
+            con.close()
+
+        if quantiles == 'approx':
+            grouped_df = self.add_sketch_quantiles(grouped_df)
+
+        return grouped_df[[*keys, *LEADERBOARD_COLUMNS]]
@@ -0,0 +1,76 @@
+import contextlib
+import glob
+import hashlib
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+class ArrowStore:
+    """
+    Arrow IPC files shared by every worker process on the host.
+
+    Tables are written uncompressed and read back through pa.memory_map,
+    so their buffers point straight into the OS page cache: every worker
+    maps the same physical pages instead of holding a private copy, and a
+    new worker starts warm. Writes go to a temporary file that is renamed
+    into place, so readers only ever see complete files.
+    """
+
+    def __init__(self, root, max_files=256):
+        self.root = root
+        self.max_files = max_files
+
+    def path_for(self, namespace, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.root, namespace, f"{digest}.arrow")
+
+    def get_table(self, namespace, key):
+        """
+        Memory-map the table stored under `key`, or return None.
+        """
+        try:
+            source = pa.memory_map(self.path_for(namespace, key), 'r')
+        except FileNotFoundError:
+            return None
+        return ipc.open_file(source).read_all()
+
+    def put_table(self, namespace, key, table, keep=None):
+        path = self.path_for(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.prune(namespace, keep)
+        return path
+
+    def get_frame(self, namespace, key):
+        table = self.get_table(namespace, key)
+        return None if table is None else table.to_pandas()
+
+    def put_frame(self, namespace, key, df):
+        return self.put_table(namespace, key, pa.Table.from_pandas(df, preserve_index=False))
+
+    def prune(self, namespace, keep=None):
+        """
+        Delete all but the `keep` most recently written files of a namespace
+        (max_files by default). Workers that still map a deleted file keep
+        reading it until they drop the table.
+        """
+        keep = self.max_files if keep is None else keep
+        files = []
+        # Another worker's prune may delete files under us
+        for path in glob.glob(os.path.join(self.root, namespace, '*.arrow')):
+            with contextlib.suppress(FileNotFoundError):
+                files.append((os.path.getmtime(path), path))
+        files.sort(reverse=True)
+        for _, path in files[keep:]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
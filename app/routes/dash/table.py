@@ -0,0 +1,104 @@
+import re
+
+# Comparison operators emitted by DataTable's filter row, in both spellings
+COMPARISONS = {
+    'ge': 'ge', '>=': 'ge',
+    'le': 'le', '<=': 'le',
+    'gt': 'gt', '>': 'gt',
+    'lt': 'lt', '<': 'lt',
+    'ne': 'ne', '!=': 'ne',
+    'eq': 'eq', '=': 'eq',
+    'contains': 'contains',
+    'datestartswith': 'datestartswith',
+}
+
+_FILTER_PART = re.compile(r'^\s*\{(?P<column>[^}]+)\}\s*(?P<operator>\S+)\s*(?P<value>.*?)\s*$')
+
+
+def split_filter_part(filter_part):
+    """
+    Split one `{column} operator value` clause of a DataTable filter_query.
+    Returns (column, operator, value, case_sensitive), or None when the
+    clause cannot be parsed. The value is the clause's text, unquoted;
+    filter_frame decides whether it is a number from the column it is
+    compared with.
+    """
+    match = _FILTER_PART.match(filter_part)
+    if not match:
+        return None
+    column, operator, value = match.group('column', 'operator', 'value')
+
+    # 'icontains'/'scontains'/'ieq'... select case (in)sensitive matching
+    case_sensitive = True
+    if operator not in COMPARISONS and operator[:1] in ('i', 's') and operator[1:] in COMPARISONS:
+        case_sensitive = operator[0] == 's'
+        operator = operator[1:]
+    if operator not in COMPARISONS:
+        return None
+
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'", '`'):
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    return column, COMPARISONS[operator], value, case_sensitive
+
+
+def filter_frame(df, filter_query):
+    """
+    Apply a DataTable filter_query (clauses joined by ' && ') to a DataFrame.
+    `contains` and `datestartswith` match the value as text; comparisons
+    on numeric columns compare it as a number. Clauses on unknown columns,
+    with unknown operators or comparing a numeric column with text are
+    ignored.
+    """
+    if not filter_query:
+        return df
+    mask = None
+    for part in filter_query.split(' && '):
+        parsed = split_filter_part(part)
+        if parsed is None or parsed[0] not in df.columns:
+            continue
+        column, operator, value, case_sensitive = parsed
+        series = df[column]
+        if operator == 'contains':
+            condition = series.astype(str).str.contains(value, case=case_sensitive, regex=False)
+        elif operator == 'datestartswith':
+            condition = series.astype(str).str.startswith(value)
+        elif series.dtype.kind in 'iuf':
+            try:
+                condition = getattr(series, operator)(float(value))
+            except ValueError:
+                continue
+        else:
+            if not case_sensitive:
+                series, value = series.astype(str).str.lower(), value.lower()
+            try:
+                condition = getattr(series, operator)(value)
+            except TypeError:
+                continue
+        condition = condition.fillna(False).astype(bool)
+        mask = condition if mask is None else mask & condition
+    return df if mask is None else df[mask]
+
+
+def sort_frame(df, sort_by):
+    """
+    Apply a DataTable sort_by list to a DataFrame.
+    """
+    sort_by = [col for col in (sort_by or []) if col['column_id'] in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [col['column_id'] for col in sort_by],
+        ascending=[col['direction'] == 'asc' for col in sort_by],
+        kind='mergesort',
+        na_position='last'
+    )
+
+
+def page_frame(df, page_current, page_size):
+    """
+    Slice one page out of a DataFrame. Returns the page and the page count.
+    """
+    page_count = max(1, -(-len(df) // page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+    return df.iloc[start:start + page_size], page_count
@@ -0,0 +1,109 @@
+import json
+import logging
+import resource
+import sys
+import time
+
+from ...metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+# Peak RSS growth buckets in bytes, 1 MB to 4 GB
+RSS_BUCKETS = tuple(2 ** i * 1024 * 1024 for i in range(0, 13))
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'dhh_stage_seconds', 'Wall time of one DHHCalculator pipeline stage.', ('engine', 'stage'))
+STAGE_RSS = REGISTRY.histogram(
+    'dhh_stage_peak_rss_delta_bytes', 'Growth of the process peak RSS during one pipeline stage.',
+    ('engine', 'stage'), buckets=RSS_BUCKETS)
+STAGE_ROWS_IN = REGISTRY.counter(
+    'dhh_stage_rows_in_total', 'Rows entering a pipeline stage.', ('engine', 'stage'))
+STAGE_ROWS_OUT = REGISTRY.counter(
+    'dhh_stage_rows_out_total', 'Rows leaving a pipeline stage.', ('engine', 'stage'))
+LEADERBOARD_SECONDS = REGISTRY.histogram(
+    'dhh_leaderboard_seconds', 'Wall time of DHHCalculator.process by engine and cache path.',
+    ('engine', 'quantiles', 'cache'))
+LEADERBOARD_ERRORS = REGISTRY.counter(
+    'dhh_leaderboard_errors_total', 'Failed leaderboard computations by engine and exception type.',
+    ('engine', 'quantiles', 'error'))
+
+
+def peak_rss_bytes():
+    """
+    High-water mark of this process' resident set size.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+def _rows(value):
+    shape = getattr(value, 'shape', None)
+    return shape[0] if shape else None
+
+
+class PipelineTrace:
+    """
+    Per-stage timings for one leaderboard request.
+
+    Each stage records wall time, rows in and out, and how much the process
+    peak RSS grew while it ran. The peak is process-wide, so concurrent
+    requests share it: a stage that stays under an earlier peak reports 0.
+    finish() logs one structured line and feeds the /metrics histograms;
+    fail() logs a failed computation with its traceback and counts it.
+    """
+
+    def __init__(self, engine, quantiles, stdate=None, endate=None):
+        self.engine = engine
+        self.quantiles = quantiles
+        self.stdate = stdate
+        self.endate = endate
+        self.cache = 'computed'
+        self.stages = []
+        self._start = time.perf_counter()
+
+    def run(self, stage, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) as a named stage and return its result.
+        Rows in are taken from the first argument, rows out from the result.
+        """
+        rows_in = _rows(args[0]) if args else None
+        rss_before, start = peak_rss_bytes(), time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        rss_delta = peak_rss_bytes() - rss_before
+        rows_out = _rows(result)
+
+        self.stages.append({
+            'stage': stage, 'seconds': round(seconds, 6), 'rows_in': rows_in,
+            'rows_out': rows_out, 'peak_rss_delta': rss_delta,
+        })
+        STAGE_SECONDS.observe(seconds, engine=self.engine, stage=stage)
+        STAGE_RSS.observe(rss_delta, engine=self.engine, stage=stage)
+        if rows_in is not None:
+            STAGE_ROWS_IN.inc(rows_in, engine=self.engine, stage=stage)
+        if rows_out is not None:
+            STAGE_ROWS_OUT.inc(rows_out, engine=self.engine, stage=stage)
+        return result
+
+    def finish(self, rows=None):
+        seconds = time.perf_counter() - self._start
+        LEADERBOARD_SECONDS.observe(seconds, engine=self.engine, quantiles=self.quantiles, cache=self.cache)
+        logger.info(
+            "leaderboard engine=%s quantiles=%s cache=%s window=%s..%s seconds=%.4f rows=%s stages=%s",
+            self.engine, self.quantiles, self.cache, self.stdate, self.endate, seconds, rows,
+            json.dumps(self.stages)
+        )
+        return seconds
+
+    def fail(self, error):
+        """
+        Record a failed computation; the caller re-raises `error`.
+        """
+        LEADERBOARD_ERRORS.inc(engine=self.engine, quantiles=self.quantiles, error=type(error).__name__)
+        logger.error(
+            "leaderboard failed engine=%s quantiles=%s window=%s..%s stages=%s error=%s",
+            self.engine, self.quantiles, self.stdate, self.endate, json.dumps(self.stages), error,
+            exc_info=error
+        )
@@ -0,0 +1,201 @@
+import threading
+from collections import OrderedDict
+
+import duckdb
+import numpy as np
+
+from .ingest import ROLLUP_FILE
+from .leaderboard import as_date
+
+# Rolling window units: the last N batted balls, or the last N calendar days
+TREND_UNITS = ('bbe', 'days')
+
+# Trend rates computed from the daily rollup: rate name -> rollup count column
+TREND_RATES = {'DHH%': 'dhh', 'Barrel%': 'barrel'}
+
+# Day ordinals of different batters are kept apart in the combined sort key
+_GROUP_STRIDE = 1 << 32
+
+
+class RollingTrends:
+    """
+    Rolling rates for many players, stored as flat arrays.
+
+    Points of all players are concatenated in (batter, game_date) order and
+    player p owns rows offsets[p]:offsets[p + 1], like a CSR matrix, so the
+    whole result is a handful of numpy arrays and a player's series is a
+    pair of slices, not a copy.
+    """
+
+    def __init__(self, unit, window, batters, names, offsets, dates, daily_bbe, bbe, rates):
+        self.unit = unit
+        self.window = window
+        self.batters = batters
+        self.names = names
+        self.offsets = offsets
+        self.dates = dates
+        self.daily_bbe = daily_bbe
+        self.bbe = bbe
+        self.rates = rates
+        self._index = {int(batter): i for i, batter in enumerate(batters)}
+
+    def __len__(self):
+        return len(self.batters)
+
+    def __contains__(self, batter):
+        return int(batter) in self._index
+
+    def totals(self):
+        """
+        Batted balls of each player over the whole range, aligned with batters.
+        """
+        if not len(self.batters):
+            return np.array([], dtype=np.int64)
+        return np.add.reduceat(self.daily_bbe.astype(np.int64), self.offsets[:-1])
+
+    def name_of(self, batter):
+        return self.names[self._index[int(batter)]]
+
+    def series(self, batter):
+        """
+        dates, window BBE and {rate: values} of one player.
+        """
+        i = self._index[int(batter)]
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return self.dates[rows], self.bbe[rows], {name: values[rows] for name, values in self.rates.items()}
+
+
+def _group_starts(groups):
+    """
+    Index of the first row of each row's group, for rows sorted by group,
+    and the start index of every group.
+    """
+    if not len(groups):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    starts = np.r_[0, np.flatnonzero(groups[1:] != groups[:-1]) + 1]
+    return np.repeat(starts, np.diff(np.r_[starts, len(groups)])), starts
+
+
+def rolling_sums(groups, days, bbe, counts, unit, window):
+    """
+    Sliding-window sums over daily rows sorted by (group, day), all groups
+    in one vectorized pass over prefix sums.
+
+    unit='days' sums the rows of the last `window` calendar days up to each
+    row. unit='bbe' sums the last `window` batted balls as of the end of
+    each row's day; pitch order within a day is not recorded, so the oldest
+    day in the window contributes its counts pro rata. Rows with fewer than
+    `window` batted balls behind them sum everything so far, and their
+    window BBE is below `window`.
+
+    Returns the window BBE and one array of window sums per count array.
+    """
+    n = len(groups)
+    row_start, _ = _group_starts(groups)
+    cum_bbe = np.r_[0, np.cumsum(bbe, dtype=np.int64)]
+    cums = [np.r_[0, np.cumsum(c, dtype=np.int64)] for c in counts]
+    end = np.arange(1, n + 1)
+
+    if unit == 'days':
+        key = groups.astype(np.int64) * _GROUP_STRIDE + days
+        start = np.searchsorted(key, key - (window - 1), side='left')
+        return cum_bbe[end] - cum_bbe[start], [cum[end] - cum[start] for cum in cums]
+
+    # unit == 'bbe': position (in global BBE order) where the window begins
+    target = cum_bbe[end] - window
+    full = target > cum_bbe[row_start]
+    # Boundary row k holds the window's oldest BBE: cum_bbe[k] <= target < cum_bbe[k + 1]
+    k = np.where(full, np.searchsorted(cum_bbe, target, side='right') - 1, row_start)
+    taken = np.where(full, cum_bbe[k + 1] - target, bbe[k])
+    share = taken / bbe[k]
+    window_bbe = cum_bbe[end] - cum_bbe[k + 1] + taken
+    sums = [cum[end] - cum[k + 1] + share * c[k] for cum, c in zip(cums, counts)]
+    return window_bbe, sums
+
+
+def daily_counts(calculator, stdate=None, endate=None):
+    """
+    Per batter and day BBE and trend counts from the daily rollup, sorted
+    by (batter, game_date), as numpy arrays.
+    """
+    calculator.ensure_rollup()
+    rollup_files = calculator.window_files(calculator.rollup_dir, ROLLUP_FILE, stdate, endate)
+    conditions, params = [], []
+    if stdate is not None:
+        conditions.append("game_date >= ?")
+        params.append(as_date(stdate))
+    if endate is not None:
+        conditions.append("game_date <= ?")
+        params.append(as_date(endate))
+    count_columns = ', '.join(f"SUM({column})::INTEGER AS {column}" for column in TREND_RATES.values())
+    query = f"""
+        SELECT batter, ANY_VALUE(player_name) AS player_name, game_date, SUM(bbe)::INTEGER AS bbe, {count_columns}
+        FROM read_parquet({rollup_files!r})
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        GROUP BY batter, game_date
+        ORDER BY batter, game_date
+    """
+    con = duckdb.connect(database=':memory:')
+    try:
+        table = con.execute(query, params).arrow()
+    finally:
+        con.close()
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def compute_trends(calculator, stdate, endate, window, unit='bbe'):
+    """
+    Rolling DHH% and Barrel% of every batter over [stdate, endate], one
+    point per game day, as a RollingTrends.
+    """
+    if unit not in TREND_UNITS:
+        raise ValueError(f"Unknown trend unit '{unit}', expected one of {TREND_UNITS}")
+    if window < 1:
+        raise ValueError("Trend window must be at least 1")
+
+    daily = daily_counts(calculator, stdate, endate)
+    batters_per_row = daily['batter'].astype(np.int64)
+    days = daily['game_date'].astype('datetime64[D]')
+    _, starts = _group_starts(batters_per_row)
+    counts = [daily[column].astype(np.int64) for column in TREND_RATES.values()]
+
+    window_bbe, sums = rolling_sums(batters_per_row, days.astype(np.int64), daily['bbe'].astype(np.int64),
+                                    counts, unit, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = {name: (total / window_bbe * 100).astype(np.float32) for name, total in zip(TREND_RATES, sums)}
+
+    trends = RollingTrends(
+        unit, window,
+        batters=batters_per_row[starts],
+        names=daily['player_name'][starts],
+        offsets=np.r_[starts, len(batters_per_row)],
+        dates=days,
+        daily_bbe=daily['bbe'].astype(np.int32),
+        bbe=window_bbe.astype(np.int32),
+        rates=rates,
+    )
+    return trends
+
+
+_trends_cache = OrderedDict()
+_trends_lock = threading.Lock()
+TRENDS_CACHE_SIZE = 16
+
+
+def rolling_trends(calculator, stdate, endate, window, unit='bbe'):
+    """
+    compute_trends, memoized per query and data version so chart callbacks
+    reuse the arrays instead of recomputing them.
+    """
+    key = (calculator.base_dir, as_date(stdate), as_date(endate), int(window), unit, calculator.data_version())
+    with _trends_lock:
+        if key in _trends_cache:
+            _trends_cache.move_to_end(key)
+            return _trends_cache[key]
+    trends = compute_trends(calculator, stdate, endate, int(window), unit)
+    with _trends_lock:
+        _trends_cache[key] = trends
+        while len(_trends_cache) > TRENDS_CACHE_SIZE:
+            _trends_cache.popitem(last=False)
+    return trends
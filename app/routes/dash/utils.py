@@ -1,37 +1,122 @@
 import os
 import pandas as pd
 import duckdb
-from datetime import datetime
-import sqlite3
 import numpy as np
-import gdown
 from concurrent.futures import ThreadPoolExecutor
 import stat
 import shutil
+import time
+import hashlib
+import bisect
+import json
+import logging
+import uuid
+from .cache import leaderboard_cache, leaderboard_flights
+from .groupings import GroupingsMixin
+from .ingest import PITCHES_FILE, dataset_lock, list_partitions, source_query, write_partitions
+from .leaderboard import (CLASSIFICATION_SQL, DHH_SQL, ENGINES, GROUPING_ENGINES, GROUPINGS, LEADERBOARD_COLUMNS,
+                          PITCH_DTYPES, QUANTILE_MODES, as_date, period_ranges)
+from .parallel import ParallelMixin
+from .registry import player_registry
+from .rollup import RollupMixin
+from .sketch import QuantileSketch, sketch_quantiles
+from .sql_engine import SqlEngineMixin
+from .store import ArrowStore
+from .trace import PipelineTrace
 
-class DHHCalculator:
-    def __init__(self, parquet_file, google_sheet_url, db_file_name, table_name, output_file, base_dir):
+logger = logging.getLogger(__name__)
+
+# Date-partitioned pitch dataset and the per-(batter, game_date) rollup built from it
+STATCAST_DIR = 'statcast'
+ROLLUP_DIR = 'dhh_daily_rollup_v2'
+VERSION_FILE = '_version'
+
+# Memory-mapped Arrow files shared by all worker processes
+STORE_DIR = 'arrow_store'
+
+# Persisted leaderboard CSVs, one content-addressed file per query and data
+# version, written off the request thread
+RESULTS_DIR = 'results'
+RESULTS_KEEP = 256
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='leaderboard-persist')
+
+# Parsed offset index of the current batter_index snapshot, by pitch version
+_batter_offsets = {}
+
+# Part of every result cache key; bumped whenever the processed
+# leaderboard's columns change, so results of an older layout kept in the
+# shared store are not served
+RESULT_LAYOUT = 2
+
+# Production data locations used by the dashboards and the ingestion CLI
+DATA_DIR = "/var/www/basebotics/datab"
+PARQUET_FILE = 'savant_2023-03-30_2024-09-30.parquet'
+GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/112FJwhapiSNgxepFJQhJnudk_ub5PI9GBN7DMUKBTjc/export?format=csv"
+DB_FILE_NAME = "/var/www/basebotics/datab/google_sheet.db"
+TABLE_NAME = "google_sheet"
+OUTPUT_FILE = "/var/www/basebotics/datab/google_sheet.csv"
+
+def default_calculator():
+    """
+    DHHCalculator configured for the production data directory.
+    """
+    return DHHCalculator(PARQUET_FILE, GOOGLE_SHEET_URL, DB_FILE_NAME, TABLE_NAME, OUTPUT_FILE, DATA_DIR,
+                         shared_store=True)
+
+
+def file_version(*paths):
+    """
+    Short hash of the mtimes and sizes of `paths` (missing files included).
+    """
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append(f"{path}:{st.st_mtime_ns}:{st.st_size}")
+        except FileNotFoundError:
+            fingerprint.append(f"{path}:missing")
+    return hashlib.sha1('|'.join(fingerprint).encode()).hexdigest()[:16]
+
+
+def _report_persist_error(future):
+    if future.exception() is not None:
+        logger.error("Error persisting leaderboard: %s", future.exception())
+
+
+class DHHCalculator(SqlEngineMixin, RollupMixin, ParallelMixin, GroupingsMixin):
+    def __init__(self, parquet_file, google_sheet_url, db_file_name, table_name, output_file, base_dir,
+                 shared_store=False, persist_results=False, workers=None, prepare_dirs=True):
         """
         Initialize the DHHCalculator with the necessary file paths and URLs.
         Ensure the base directory exists and files inherit proper permissions.
         """
+        # Rebuilds an equivalent calculator in the parallel engine's workers
+        self._init_args = (parquet_file, google_sheet_url, db_file_name, table_name, output_file, base_dir)
         self.base_dir = base_dir
         self.parquet_file = os.path.join(base_dir, parquet_file)
         self.google_sheet_url = google_sheet_url
         self.db_file_name = os.path.join(base_dir, db_file_name)
         self.table_name = table_name
         self.output_file = os.path.join(base_dir, output_file)
+        self.dataset_dir = os.path.join(base_dir, STATCAST_DIR)
+        self.rollup_dir = os.path.join(base_dir, ROLLUP_DIR)
+        self.shared_store = shared_store
+        self.arrow_store = ArrowStore(os.path.join(base_dir, STORE_DIR))
+        self.persist_results = persist_results
+        self.results_dir = os.path.join(base_dir, RESULTS_DIR)
+        self.workers = workers or os.cpu_count() or 1
+        # DuckDB threads of load_data's scan (DuckDB's default when None)
+        self.scan_threads = None
 
-        # Ensure base directory exists
-        os.makedirs(base_dir, exist_ok=True)
-        
-        # Set directory permissions
-        self.set_permissions(base_dir)
+        if prepare_dirs:
+            # Ensure base directory exists
+            os.makedirs(base_dir, exist_ok=True)
 
-        # Pre-compile the DHH threshold calculation
-        self.calculate_dhh_threshold = np.vectorize(
-            lambda x: -0.0049 * x**2 + 0.0853 * x + 105.05
-        )
+            # Set directory permissions
+            self.set_permissions(base_dir)
+
+        # DHH threshold as a function of launch angle (scalars or arrays)
+        self.calculate_dhh_threshold = lambda x: -0.0049 * x**2 + 0.0853 * x + 105.05
 
     def set_permissions(self, path):
         """
@@ -45,27 +130,280 @@ class DHHCalculator:
         except Exception as e:
             print(f"Error setting permissions for {path}: {e}")
 
-    def load_data(self):
+    def ingest(self, source):
         """
-        Load and filter parquet data using DuckDB.
+        Add Statcast pitches (parquet/CSV path or DataFrame) to the dataset, replacing
+        the days they cover, and refresh their rollup. Returns the ingested days.
+        """
+        con = duckdb.connect(database=':memory:')
+        try:
+            if isinstance(source, pd.DataFrame):
+                con.register('incoming_pitches', source)
+                source = 'incoming_pitches'
+            with dataset_lock.hold(self.base_dir):
+                days = write_partitions(con, source_query(source), [], self.dataset_dir, PITCHES_FILE)
+        finally:
+            con.close()
+
+        self.set_permissions(self.dataset_dir)
+        self.build_rollup(days)
+        self.bump_data_version()
+        return days
+
+    def bump_data_version(self):
+        """
+        Record that the dataset changed, invalidating cached results.
+        """
+        with open(os.path.join(self.dataset_dir, VERSION_FILE), 'w') as f:
+            f.write(f"{time.time_ns()}\n")
+
+    def data_version(self):
+        """
+        Token that changes with the pitch data or the player-ID database.
+        """
+        return file_version(os.path.join(self.dataset_dir, VERSION_FILE), self.parquet_file, self.db_file_name)
+
+    def pitch_version(self):
+        """
+        Token that changes with the pitch data only.
+        """
+        return file_version(os.path.join(self.dataset_dir, VERSION_FILE), self.parquet_file)
+
+    def cache_key(self, stdate, endate, min_ip, engine, quantiles, periods=None, groupings=None):
+        """
+        Key of a processed leaderboard in the result cache.
+        """
+        key = (self.base_dir, as_date(stdate), as_date(endate), min_ip, engine, quantiles, self.data_version(),
+               RESULT_LAYOUT)
+        if periods:
+            key += (tuple(periods),)
+        if groupings:
+            key += (('groupings', *groupings),)
+        return key
+
+    def ensure_dataset(self):
+        """
+        Migrate the legacy parquet file into the partitioned dataset, once.
+        """
+        version_file = os.path.join(self.dataset_dir, VERSION_FILE)
+        if os.path.exists(version_file):
+            return
+        with dataset_lock.hold(self.base_dir):
+            if not os.path.exists(version_file) and os.path.exists(self.parquet_file):
+                self.ingest(self.parquet_file)
+
+    def resolve_window(self, stdate, endate):
+        """
+        [stdate, endate] as dates, an open end taken from the dataset's first or last day.
+        """
+        stdate, endate = as_date(stdate), as_date(endate)
+        if stdate is None or endate is None:
+            date_range = self.date_range()
+            if date_range is None:
+                raise FileNotFoundError(f"No pitch data found under {self.dataset_dir}")
+            stdate, endate = stdate or date_range[0], endate or date_range[1]
+        return stdate, endate
+
+    def date_range(self):
+        """
+        First and last game day in the dataset, or None when it is empty.
+        """
+        self.ensure_dataset()
+        days = list(list_partitions(self.dataset_dir, PITCHES_FILE))
+        return (days[0], days[-1]) if days else None
+
+    def window_files(self, root, file_name, stdate=None, endate=None):
+        """
+        Files of a partitioned dataset overlapping [stdate, endate].
+        """
+        partitions = list_partitions(root, file_name, as_date(stdate), as_date(endate))
+        if not partitions:
+            # An empty window still needs the schema: scan any one day and let
+            # the game_date predicate discard its rows.
+            partitions = list_partitions(root, file_name)
+            if not partitions:
+                raise FileNotFoundError(f"No {file_name} partitions found under {root}")
+            partitions = dict([next(iter(partitions.items()))])
+        return list(partitions.values())
+
+    def data_files(self, stdate=None, endate=None):
+        """
+        Pitch partitions a query over [stdate, endate] needs to read.
+        """
+        self.ensure_dataset()
+        return self.window_files(self.dataset_dir, PITCHES_FILE, stdate, endate)
+
+    def pitch_snapshot(self, stdate=None, endate=None):
+        """
+        Slice of the memory-mapped Arrow snapshot of the scanned pitches for [stdate, endate].
+        """
+        version = self.pitch_version()
+        table = self.arrow_store.get_table('pitches', version)
+        if table is None:
+            table = leaderboard_flights.do(('pitch_snapshot', self.base_dir, version),
+                                           lambda: self._build_pitch_snapshot(version))
+
+        offsets = json.loads(table.schema.metadata[b'day_offsets'])
+        days = list(offsets)
+        lo = bisect.bisect_left(days, as_date(stdate).isoformat()) if stdate is not None else 0
+        hi = bisect.bisect_right(days, as_date(endate).isoformat()) if endate is not None else len(days)
+        if lo >= hi:
+            return table.slice(0, 0)
+        start, stop = offsets[days[lo]][0], offsets[days[hi - 1]][1]
+        return table.slice(start, stop - start)
+
+    def _build_pitch_snapshot(self, version):
+        table = self.arrow_store.get_table('pitches', version)
+        if table is not None:
+            return table
+        con = duckdb.connect(database=':memory:')
+        try:
+            query, params = self.scan_query()
+            snapshot = con.execute(f"{query} ORDER BY game_date", params).arrow()
+            day_counts = con.execute("""
+                SELECT CAST(game_date AS DATE) AS day, COUNT(*) AS n
+                FROM snapshot GROUP BY day ORDER BY day
+            """).fetchall()
+        finally:
+            con.close()
+        offsets, start = {}, 0
+        for day, n in day_counts:
+            offsets[day.isoformat()] = [start, start + n]
+            start += n
+        snapshot = snapshot.replace_schema_metadata({'day_offsets': json.dumps(offsets)})
+        self.arrow_store.put_table('pitches', version, snapshot, keep=1)
+        return self.arrow_store.get_table('pitches', version)
+
+    def batter_index(self):
+        """
+        Memory-mapped classified pitches clustered by batter, and their {batter: [start, stop]} offsets.
+        """
+        version = self.pitch_version()
+        table = self.arrow_store.get_table('batter_pitches', version)
+        if table is None:
+            table = leaderboard_flights.do(('batter_index', self.base_dir, version),
+                                           lambda: self._build_batter_index(version))
+        offsets = _batter_offsets.get(version)
+        if offsets is None:
+            offsets = json.loads(table.schema.metadata[b'batter_offsets'])
+            _batter_offsets.clear()
+            _batter_offsets[version] = offsets
+        return table, offsets
+
+    def _build_batter_index(self, version):
+        table = self.arrow_store.get_table('batter_pitches', version)
+        if table is not None:
+            return table
+        con = duckdb.connect(database=':memory:')
+        try:
+            query, params = self.scan_query()
+            flags = ', '.join(f'({condition})::UTINYINT AS "{col}"'
+                              for col, condition in {**CLASSIFICATION_SQL, 'DHH': DHH_SQL}.items())
+            clustered = con.execute(f"""
+                SELECT *, {flags} FROM ({query} AND batter IS NOT NULL) ORDER BY batter, game_date
+            """, params).arrow()
+            batter_counts = con.execute(
+                "SELECT batter, COUNT(*) AS n FROM clustered GROUP BY batter ORDER BY batter"
+            ).fetchall()
+        finally:
+            con.close()
+        offsets, start = {}, 0
+        for batter, n in batter_counts:
+            offsets[str(int(batter))] = [start, start + n]
+            start += n
+        clustered = clustered.replace_schema_metadata({'batter_offsets': json.dumps(offsets)})
+        self.arrow_store.put_table('batter_pitches', version, clustered, keep=1)
+        return self.arrow_store.get_table('batter_pitches', version)
+
+    def batter_pitches(self, batter, stdate=None, endate=None):
+        """
+        Classified batted balls of one batter in [stdate, endate], read from batter_index.
+        """
+        table, offsets = self.batter_index()
+        start, stop = offsets.get(str(int(batter)), (0, 0))
+        rows = table.slice(start, stop - start)
+        # Rows are in date order: narrow to the window before converting
+        days = rows.column('game_date').to_numpy().astype('datetime64[D]')
+        lo = np.searchsorted(days, np.datetime64(as_date(stdate)), 'left') if stdate is not None else 0
+        hi = np.searchsorted(days, np.datetime64(as_date(endate)), 'right') if endate is not None else len(days)
+        return rows.slice(lo, max(0, hi - lo)).to_pandas(date_as_object=False)
+
+    def open_scan(self, con, stdate=None, endate=None):
+        """
+        Scan query for [stdate, endate] over the shared snapshot or the parquet partitions.
+        """
+        if self.shared_store:
+            con.register('pitch_snapshot', self.pitch_snapshot(stdate, endate))
+            return self.scan_query(stdate, endate, relation='pitch_snapshot')
+        return self.scan_query(stdate, endate)
+
+    def scan_query(self, stdate=None, endate=None, files=None, relation=None, extra_columns=()):
+        """
+        Pitch-level scan shared by every engine. Returns the SQL text and its parameters.
         """
+        if relation is None:
+            if files is None:
+                files = self.data_files(stdate, endate)
+            relation = f"read_parquet({files!r}, union_by_name = true)"
         required_columns = [
             'game_date', 'player_name', 'batter', 'description', 
             'launch_speed', 'launch_angle', 'release_speed', 
-            'hit_distance_sc'
+            'hit_distance_sc', *extra_columns
         ]
+        select_columns = [
+            f"TRY_CAST({col} AS DOUBLE) AS {col}" if col in ('launch_speed', 'launch_angle') else col
+            for col in required_columns
+        ]
+        conditions = [
+            "description != 'foul'",
+            "TRY_CAST(launch_speed AS DOUBLE) IS NOT NULL",
+            "TRY_CAST(launch_angle AS DOUBLE) IS NOT NULL"
+        ]
+        params = []
+        if stdate is not None:
+            conditions.append("game_date >= ?")
+            params.append(as_date(stdate))
+        if endate is not None:
+            conditions.append("game_date <= ?")
+            params.append(as_date(endate))
+
+        query = f"""
+            SELECT {', '.join(select_columns)}
+            FROM {relation}
+            WHERE {' AND '.join(conditions)}
+        """
+        return query, params
+
+    def load_data(self, stdate=None, endate=None):
+        """
+        Load and filter parquet data using DuckDB.
+        """
         con = duckdb.connect(database=':memory:')
         try:
-            query = f"""
-                SELECT {', '.join(required_columns)}
-                FROM parquet_scan('{self.parquet_file}')
-                WHERE description != 'foul'
-            """
-            df = con.execute(query).df()
-            print(f"Loaded data shape: {df.shape}")
+            if self.scan_threads:
+                con.execute(f"SET threads = {int(self.scan_threads)}")
+                con.execute("SET enable_progress_bar = false")
+            query, params = self.open_scan(con, stdate, endate)
+            table = con.execute(query, params).arrow()
         finally:
             con.close()
-        return df
+        # Strings go straight from Arrow to categoricals, never to Python objects
+        return self.compact_pitches(table.to_pandas(strings_to_categorical=True, date_as_object=False))
+
+    def compact_pitches(self, df):
+        """
+        Shrink a pitch-level frame to categorical names and PITCH_DTYPES.
+        """
+        for col in ('player_name', 'description'):
+            if df[col].dtype != 'category':
+                df[col] = df[col].astype('category')
+            # Lexical category order keeps groupby output sorted by name
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+        for col in ('release_speed', 'hit_distance_sc'):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        if df['batter'].isna().any():
+            df = df[df['batter'].notna()]
+        return df.astype(PITCH_DTYPES)
 
     def calculate_missing_columns(self, df):
         """
@@ -84,19 +422,14 @@ class DHHCalculator:
         ls_mult_2_minus_la = ls * 2 - la
         ls_plus_la_mult_2 = ls + la * 2
         
-        # Initialize all columns at once
-        new_columns = ['Barrel', 'Solid-Contact', 'Poorly-Weak', 'Flare-or-Burner', 
-                      'Poorly-Under', 'Poorly-Topped', 'Unclassified']
-        df[new_columns] = 0
-        
-        # Vectorized conditions for each classification
+        # Vectorized conditions for each classification, stored as uint8 flags
         barrel_mask = (
             (ls_mult_1_5_minus_la >= 117) & 
             (ls_plus_la >= 124) & 
             (ls >= 98) & 
             (la.between(4, 50))
         )
-        df.loc[barrel_mask, 'Barrel'] = 1
+        df['Barrel'] = barrel_mask.astype(np.uint8)
         
         solid_contact_mask = (
             (ls_mult_1_5_minus_la >= 111) & 
@@ -104,10 +437,10 @@ class DHHCalculator:
             (ls >= 95) & 
             (la.between(0, 52))
         )
-        df.loc[solid_contact_mask, 'Solid-Contact'] = 1
+        df['Solid-Contact'] = solid_contact_mask.astype(np.uint8)
         
         poorly_weak_mask = (ls <= 59)
-        df.loc[poorly_weak_mask, 'Poorly-Weak'] = 1
+        df['Poorly-Weak'] = poorly_weak_mask.astype(np.uint8)
         
         flare_burner_mask = (
             ((ls_mult_2_minus_la >= 87) & (la <= 41) & 
@@ -120,22 +453,21 @@ class DHHCalculator:
             ((ls - la >= 76) & (ls + la * 2.4 >= 98) & 
              (ls >= 95) & (la <= 30))
         )
-        df.loc[flare_burner_mask, 'Flare-or-Burner'] = 1
+        df['Flare-or-Burner'] = flare_burner_mask.astype(np.uint8)
         
         poorly_under_mask = (ls_plus_la_mult_2 >= 116)
-        df.loc[poorly_under_mask, 'Poorly-Under'] = 1
+        df['Poorly-Under'] = poorly_under_mask.astype(np.uint8)
         
         poorly_topped_mask = (ls_plus_la_mult_2 <= 116)
-        df.loc[poorly_topped_mask, 'Poorly-Topped'] = 1
+        df['Poorly-Topped'] = poorly_topped_mask.astype(np.uint8)
         
-        # Set Unclassified efficiently
-        classification_columns = [col for col in new_columns if col != 'Unclassified']
-        unclassified_mask = (df[classification_columns].sum(axis=1) == 0)
-        df.loc[unclassified_mask, 'Unclassified'] = 1
+        # Unclassified: none of the classes above
+        unclassified_mask = ~(barrel_mask | solid_contact_mask | poorly_weak_mask | flare_burner_mask |
+                              poorly_under_mask | poorly_topped_mask)
+        df['Unclassified'] = unclassified_mask.astype(np.uint8)
         
-        # Calculate DHH efficiently
-        df['DHH_Thres'] = self.calculate_dhh_threshold(la)
-        df['DHH'] = (ls > df['DHH_Thres']).astype(int)
+        # DHH against the threshold, without materializing the threshold column
+        df['DHH'] = (ls > self.calculate_dhh_threshold(la)).astype(np.uint8)
         
         return df
 
@@ -156,14 +488,22 @@ class DHHCalculator:
         df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
         
         # Add BBE column
-        df['BBE'] = 1
+        df['BBE'] = np.uint8(1)
         
         return df
 
-    def calculate_dhh(self, df):
+    def calculate_dhh(self, df, quantiles='exact'):
         """
         Optimized DHH calculation using efficient groupby operations.
         """
+        ev_aggs = ['mean', 'max']
+        ev_columns = ['AVG EV', 'MaxEV']
+        if quantiles == 'exact':
+            ev_aggs += [lambda x: x.quantile(0.5),
+                        lambda x: x.quantile(0.9),
+                        lambda x: x.quantile(0.95)]
+            ev_columns += ['P50 EV', 'P90 EV', 'P95 EV']
+
         # Define aggregations
         agg_dict = {
             'BBE': 'sum',
@@ -177,22 +517,38 @@ class DHHCalculator:
             'DHH': 'sum',
             'release_speed': 'mean',
             'hit_distance_sc': 'mean',
-            'launch_speed': ['mean', 'max', 
-                           lambda x: x.quantile(0.5),
-                           lambda x: x.quantile(0.9),
-                           lambda x: x.quantile(0.95)],
+            'launch_speed': ev_aggs,
             'launch_angle': ['mean', 'std']
         }
         
+        # Accumulate the float32 measurements in float64
+        df = df.assign(**{col: df[col].astype('float64') for col in ('release_speed', 'hit_distance_sc')})
+
         # Perform groupby efficiently
-        grouped_df = df.groupby(['player_name', 'batter']).agg(agg_dict).reset_index()
+        grouped_df = df.groupby(['player_name', 'batter'], observed=True).agg(agg_dict).reset_index()
         
         # Rename columns
         grouped_df.columns = ['player_name', 'batter', 'BBE', 'Barrel', 'Solid-Contact',
                             'Poorly-Weak', 'Flare-or-Burner', 'Poorly-Under', 'Poorly-Topped',
                             'Unclassified', 'DHH', 'AVG Pitches Velo', 'AVG Hit Distance',
-                            'AVG EV', 'MaxEV', 'P50 EV', 'P90 EV', 'P95 EV', 'AVG LA', 'Sd(LA)']
+                            *ev_columns, 'AVG LA', 'Sd(LA)']
+
+        if quantiles == 'approx':
+            # One bucket-count list per player instead of the full EV vector
+            sketches = (
+                df.assign(sketch_keys=QuantileSketch.keys_for(df['launch_speed']))
+                .groupby(['player_name', 'batter', 'sketch_keys'], observed=True).size().rename('sketch_counts')
+                .reset_index(level='sketch_keys')
+                .groupby(level=['player_name', 'batter'], observed=True).agg(list)
+                .reset_index()
+            )
+            grouped_df = self.add_sketch_quantiles(
+                grouped_df.merge(sketches, on=['player_name', 'batter'], how='left')
+            )
         
+        # Back from the compact dtypes, to match the SQL engines
+        grouped_df = grouped_df.astype({'player_name': object, 'batter': 'int64', 'BBE': 'int64'})
+
         # Calculate percentages efficiently
         percentage_cols = ['Barrel', 'Solid-Contact', 'Poorly-Weak', 'Flare-or-Burner',
                          'Poorly-Under', 'Poorly-Topped', 'Unclassified', 'DHH']
@@ -200,47 +556,59 @@ class DHHCalculator:
             grouped_df[f'{col}%'] = grouped_df[col] / grouped_df['BBE'] * 100
             grouped_df.drop(columns=[col], inplace=True)
         
-        # Reorder columns
-        final_cols = ['player_name', 'batter', 'BBE', 'DHH%', 'Sd(LA)', 'AVG LA',
-                     'Barrel%', 'MaxEV', 'P95 EV', 'P90 EV', 'P50 EV', 'AVG EV',
-                     'AVG Pitches Velo', 'AVG Hit Distance', 'Solid-Contact%',
-                     'Poorly-Weak%', 'Flare-or-Burner%', 'Poorly-Under%', 'Poorly-Topped%']
-        grouped_df = grouped_df[final_cols]
-        
-        # Final column renaming
+        # Final column renaming and ordering
         grouped_df.rename(columns={'AVG LA': 'LA', 'AVG EV': 'EV'}, inplace=True)
+        grouped_df = grouped_df[LEADERBOARD_COLUMNS]
         
         return grouped_df
 
+    def add_sketch_quantiles(self, df):
+        """
+        Replace the sketch_keys/sketch_counts columns with the EV quantiles they encode.
+        """
+        df['P50 EV'], df['P90 EV'], df['P95 EV'] = sketch_quantiles(
+            df['sketch_keys'], df['sketch_counts'], [0.5, 0.9, 0.95]
+        )
+        return df.drop(columns=['sketch_keys', 'sketch_counts'])
+
+    def calculate_dhh_periods(self, df, periods, quantiles='exact'):
+        """
+        calculate_dhh for each period, led by the period's index as a `period` column.
+        """
+        game_days = df['game_date'].dt.normalize()
+        frames = []
+        for i, (_, stdate, endate) in enumerate(periods):
+            in_period = (game_days >= pd.Timestamp(stdate)) & (game_days <= pd.Timestamp(endate))
+            period_df = self.calculate_dhh(df[in_period], quantiles)
+            period_df.insert(0, 'period', i)
+            frames.append(period_df)
+        return pd.concat(frames, ignore_index=True)
 
+    def label_periods(self, df, periods):
+        """
+        Replace the `period` index column with the period labels, as `Period`.
+        """
+        labels = np.array([label for label, _, _ in periods], dtype=object)
+        df = df.copy()
+        df['period'] = labels[df['period'].to_numpy()]
+        return df.rename(columns={'period': 'Period'})
+
+    def player_registry(self):
+        """
+        The process-wide PlayerRegistry for this calculator's database.
+        """
+        return player_registry(self.db_file_name, self.table_name, self.google_sheet_url,
+                               on_created=self.set_permissions)
 
     def merge_with_player_ids(self, df):
         """
-        Merge data with player IDs from SQLite database.
+        Attach player IDs to the leaderboard, keeping batter as MLBID.
         """
-        # Create database if it doesn't exist
-        if not os.path.exists(self.db_file_name):
-            conn = sqlite3.connect(self.db_file_name)
-            try:
-                # Download Google sheet and save to CSV
-                gdown.download(self.google_sheet_url, self.output_file, quiet=False)
-                player_id_df = pd.read_csv(self.output_file)
-                player_id_df.to_sql(self.table_name, conn, index=False)
-            finally:
-                conn.close()
-
-            # Set permissions on the database file
-            self.set_permissions(self.db_file_name)
-
-        # Read from the database
-        with sqlite3.connect(self.db_file_name) as conn:
-            player_id_df = pd.read_sql(f"SELECT * FROM {self.table_name}", conn)
-
-        # Merge and clean up efficiently
-        df = pd.merge(df, player_id_df, how='left', left_on='batter', right_on='MLBID')
-        df.drop(columns=['batter', 'MLBID'], inplace=True, errors='ignore')
+        player_ids = self.player_registry().lookup(df['batter']).reset_index(drop=True)
+        df = df.rename(columns={'batter': 'MLBID'}).reset_index(drop=True)
+        df = pd.concat([df, player_ids], axis=1)
         df.rename(columns={'FANGRAPHSNAME': 'Name'}, inplace=True)
-        
+
         return df
 
     def filter_by_min_ip(self, df, min_ip):
@@ -249,34 +617,203 @@ class DHHCalculator:
         """
         return df[df['BBE'] >= min_ip]
 
-    def save_to_csv(self, df):
+    def save_to_csv(self, df, path=None):
         """
         Save the DataFrame to CSV and ensure proper permissions.
         """
-        df.to_csv(self.output_file, index=False)
-        self.set_permissions(self.output_file)
+        path = path or self.output_file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.set_permissions(path)
+        return path
+
+    def result_file(self, stdate, endate, min_ip, engine='pandas', quantiles='exact', periods=None,
+                    groupings=None):
+        """
+        Content-addressed CSV path of one leaderboard on the current data version.
+        """
+        key = self.cache_key(stdate, endate, min_ip, engine, quantiles, periods, groupings)
+        return os.path.join(self.results_dir, f"{hashlib.sha1(repr(key).encode()).hexdigest()}.csv")
+
+    def persist_result(self, df, path):
+        """
+        Write `df` to `path` on the background persist thread unless it exists.
+        """
+        if os.path.exists(path):
+            return None
+        future = _persist_executor.submit(self._write_result, df.copy(), path)
+        future.add_done_callback(_report_persist_error)
+        return future
 
-    def process(self, stdate, endate, min_ip):
+    def _write_result(self, df, path):
+        self.save_to_csv(df, path)
+        # Keep the newest RESULTS_KEEP files
+        files = sorted(
+            (os.path.join(self.results_dir, name) for name in os.listdir(self.results_dir) if name.endswith('.csv')),
+            key=os.path.getmtime, reverse=True
+        )
+        for stale in files[RESULTS_KEEP:]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        return path
+
+    def process(self, stdate, endate, min_ip, engine='pandas', quantiles='exact', use_cache=True, periods=None,
+                groupings=None):
         """
-        Optimized main process with error handling and parallel processing.
+        Leaderboard for [stdate, endate] from one of ENGINES, served from the
+        result cache and shared by concurrent identical calls.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        if quantiles not in QUANTILE_MODES:
+            raise ValueError(f"Unknown quantile mode '{quantiles}', expected one of {QUANTILE_MODES}")
+        if groupings:
+            if periods:
+                raise ValueError("Periods and groupings cannot be combined")
+            if engine not in GROUPING_ENGINES:
+                raise ValueError(f"Groupings need one of the engines {GROUPING_ENGINES}, not '{engine}'")
+            unknown = [grouping for grouping in groupings if grouping not in GROUPINGS]
+            if unknown:
+                raise ValueError(f"Unknown groupings {unknown}, expected some of {tuple(GROUPINGS)}")
+
+        # Every engine sees the same concrete window
+        stdate, endate = self.resolve_window(stdate, endate)
+        if stdate > endate:
+            raise ValueError("Start date must not be after the end date")
+
+        trace = PipelineTrace(engine, quantiles, stdate, endate)
+        if not use_cache:
+            trace.cache = 'bypass'
+            final_data = self.compute(stdate, endate, min_ip, engine, quantiles, trace, periods, groupings)
+            trace.finish(len(final_data))
+            return final_data
+
+        key = self.cache_key(stdate, endate, min_ip, engine, quantiles, periods, groupings)
+        cached = leaderboard_cache.get(key)
+        if cached is not None:
+            trace.cache = 'memory'
+            trace.finish(len(cached))
+            return cached
+
+        # Stays 'coalesced' unless this caller leads the flight
+        trace.cache = 'coalesced'
+
+        def compute_and_cache():
+            # A flight that just finished, or another worker, may have the result already
+            trace.cache = 'memory'
+            cached = leaderboard_cache.get(key, count=False)
+            if cached is None and self.shared_store:
+                trace.cache = 'store'
+                cached = trace.run('store_get', self.arrow_store.get_frame, 'leaderboards', key)
+                if cached is not None:
+                    leaderboard_cache.put(key, cached)
+            if cached is not None:
+                return cached
+
+            trace.cache = 'computed'
+            final_data = self.compute(stdate, endate, min_ip, engine, quantiles, trace, periods, groupings)
+            leaderboard_cache.put(key, final_data)
+            if self.shared_store:
+                try:
+                    trace.run('store_put', self.arrow_store.put_frame, 'leaderboards', key, final_data)
+                except Exception as e:
+                    logger.error("Error sharing leaderboard %s: %s", key, e)
+            return final_data
+
+        final_data = leaderboard_flights.do(key, compute_and_cache).copy()
+        trace.finish(len(final_data))
+        return final_data
+
+    def process_periods(self, periods, min_ip=0, engine='pandas', quantiles='exact', stdate=None, endate=None,
+                        use_cache=True):
+        """
+        Leaderboards for several periods from one scan, led by a `Period` column.
+        """
+        if isinstance(periods, str):
+            stdate, endate = self.resolve_window(stdate, endate)
+            periods = period_ranges(stdate, endate, periods)
+        else:
+            periods = [period if len(period) == 3 else (f"{as_date(period[0])}..{as_date(period[1])}", *period)
+                       for period in periods]
+            periods = [(str(label), as_date(start), as_date(end)) for label, start, end in periods]
+        if not periods:
+            raise ValueError("At least one period is required")
+        if any(start > end for _, start, end in periods):
+            raise ValueError("Period start must not be after its end")
+
+        stdate = min(start for _, start, _ in periods)
+        endate = max(end for _, _, end in periods)
+        return self.process(stdate, endate, min_ip, engine, quantiles, use_cache, periods=tuple(periods))
+
+    def process_groupings(self, stdate, endate, min_ip=0, groupings=None, engine='pandas', quantiles='exact',
+                          use_cache=True):
+        """
+        Leaderboards for several GROUPINGS from one scan, led by `Grouping`, `ID` and `Name`.
+        """
+        groupings = tuple(GROUPINGS) if groupings is None else tuple(dict.fromkeys(groupings))
+        if not groupings:
+            raise ValueError("At least one grouping is required")
+        return self.process(stdate, endate, min_ip, engine, quantiles, use_cache, groupings=groupings)
+
+    def compute(self, stdate, endate, min_ip, engine='pandas', quantiles='exact', trace=None, periods=None,
+                groupings=None):
+        """
+        Run the pipeline for one leaderboard, bypassing the cache.
+        """
+        if trace is None:
+            trace = PipelineTrace(engine, quantiles, stdate, endate)
         try:
-            with ThreadPoolExecutor() as executor:
-                # Load data
-                future_data = executor.submit(self.load_data)
-                data = future_data.result()
-                
+            if groupings and engine == 'sql':
+                dhh_data = trace.run('calculate_groupings_sql', self.calculate_groupings_sql, stdate, endate,
+                                     groupings, quantiles)
+            elif groupings:
+                data = trace.run('load_data', self.load_grouping_data, stdate, endate, groupings)
+                processed_data = trace.run('calculate_missing_columns', self.calculate_missing_columns, data)
+                filtered_data = trace.run('filter_data', self.filter_data, processed_data, stdate, endate, min_ip)
+                dhh_data = trace.run('calculate_dhh', self.calculate_dhh_groupings, filtered_data, groupings,
+                                     quantiles)
+            elif engine == 'sql':
+                dhh_data = trace.run('calculate_dhh_sql', self.calculate_dhh_sql, stdate, endate, quantiles, periods)
+            elif engine == 'rollup':
+                dhh_data = trace.run('calculate_dhh_rollup', self.calculate_dhh_rollup, stdate, endate, quantiles,
+                                     periods)
+            elif engine == 'parallel':
+                dhh_data = trace.run('calculate_dhh_parallel', self.calculate_dhh_parallel, stdate, endate, quantiles,
+                                     periods)
+            else:
+                data = trace.run('load_data', self.load_data, stdate, endate)
+
                 # Continue processing
-                processed_data = self.calculate_missing_columns(data)
-                filtered_data = self.filter_data(processed_data, stdate, endate, min_ip)
-                dhh_data = self.calculate_dhh(filtered_data)
-                merged_data = self.merge_with_player_ids(dhh_data)
-                final_data = self.filter_by_min_ip(merged_data, min_ip)
-                
-                # Save results
-                self.save_to_csv(final_data)
-                
+                processed_data = trace.run('calculate_missing_columns', self.calculate_missing_columns, data)
+                filtered_data = trace.run('filter_data', self.filter_data, processed_data, stdate, endate, min_ip)
+                if periods:
+                    dhh_data = trace.run('calculate_dhh', self.calculate_dhh_periods, filtered_data, periods,
+                                         quantiles)
+                else:
+                    dhh_data = trace.run('calculate_dhh', self.calculate_dhh, filtered_data, quantiles)
+
+            if groupings:
+                merged_data = trace.run('name_groupings', self.name_groupings, dhh_data)
+            else:
+                merged_data = trace.run('merge_with_player_ids', self.merge_with_player_ids, dhh_data)
+            final_data = trace.run('filter_by_min_ip', self.filter_by_min_ip, merged_data, min_ip)
+            if periods:
+                final_data = self.label_periods(final_data, periods)
+
+            # Save results in the background, off the request path
+            if self.persist_results:
+                path = self.result_file(stdate, endate, min_ip, engine, quantiles, periods, groupings)
+                trace.run('persist_result', self.persist_result, final_data, path)
+
             return final_data
         except Exception as e:
-            print(f"An error occurred during processing: {e}")
+            trace.fail(e)
             raise
@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template
-from .dash_app001 import create_dash_app
+from flask import Blueprint, Response, jsonify, render_template, request
+from .dash_app001 import create_dash_app, leaderboard_frame
 from .dash_app002 import create_dash_app002
+from .cache import leaderboard_cache, leaderboard_flights
+from ...metrics import REGISTRY
 
 dashboard_bp = Blueprint('dashboard', __name__, template_folder='templates')
 
@@ -11,3 +13,80 @@ def dashboard001():
 @dashboard_bp.route('/dashboard002')
 def dashboard002():
     return render_template('dash/dashboard002.html')
+
+@dashboard_bp.route('/export')
+def export_leaderboard():
+    """
+    Stream the Player Performance Tracker leaderboard for a date range,
+    view (batters by default; see LEADERBOARD_VIEWS) and minimum BBE as
+    CSV (default), Parquet or Arrow IPC. The leaderboard is read from the
+    server-side result cache and serialized in chunks.
+    """
+    from .export import EXPORT_FORMATS, stream_export  # pyarrow loads on the first export
+    export_format = request.args.get('format', 'csv')
+    start_date, end_date = request.args.get('start_date'), request.args.get('end_date')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify(error=f"format must be one of {sorted(EXPORT_FORMATS)}"), 400
+    if not start_date or not end_date:
+        return jsonify(error="start_date and end_date are required"), 400
+    try:
+        min_bbe = int(request.args.get('min_bbe', 0))
+        df = leaderboard_frame(start_date, end_date, request.args.get('view', 'batter'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    df = df[df['BBE'] >= min_bbe]
+    content_type, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_export(df, export_format),
+        content_type=content_type,
+        headers={'Content-Disposition': f'attachment; filename=player_performance.{extension}'}
+    )
+
+def columns_of(df):
+    """
+    A frame as {column: values}, with ISO dates and null for missing values.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind == 'M':
+            values = values.dt.strftime('%Y-%m-%d')
+        values = values.astype(object)
+        columns[col] = values.where(values.notna(), None).tolist()
+    return columns
+
+@dashboard_bp.route('/player/<int:batter>')
+def player_pitches(batter):
+    """
+    Drill-down of one batter: class rates, batted balls and game log for an
+    optional start_date/end_date, read through the batter offset index.
+    """
+    from .drilldown import player_drilldown
+    from .utils import default_calculator
+    try:
+        drilldown = player_drilldown(default_calculator(), batter, request.args.get('start_date'),
+                                     request.args.get('end_date'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    if drilldown is None:
+        return jsonify(error=f"No batted balls for batter {batter}"), 404
+    return jsonify({**drilldown, 'pitches': columns_of(drilldown['pitches']),
+                    'game_log': columns_of(drilldown['game_log'])})
+
+@dashboard_bp.route('/cache/stats')
+def cache_stats():
+    return jsonify({**leaderboard_cache.stats(), **leaderboard_flights.stats()})
+
+
+# Counter-like cache stats; the rest (entries, bytes, limits) are gauges
+CACHE_COUNTERS = ('hits', 'misses', 'evictions', 'expirations', 'executions', 'coalesced')
+
+def cache_metrics():
+    for name, value in {**leaderboard_cache.stats(), **leaderboard_flights.stats()}.items():
+        if name in CACHE_COUNTERS:
+            yield f'dhh_leaderboard_cache_{name}_total', 'counter', f'Leaderboard cache {name}.', value
+        else:
+            yield f'dhh_leaderboard_cache_{name}', 'gauge', f'Leaderboard cache {name.replace("_", " ")}.', value
+
+REGISTRY.add_collector(cache_metrics)
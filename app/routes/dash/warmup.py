@@ -0,0 +1,203 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from ...metrics import REGISTRY
+from .dash_app001 import DEFAULT_WINDOW, LEADERBOARD_ENGINE
+
+logger = logging.getLogger(__name__)
+
+# Seconds between data-version checks
+WARMUP_INTERVAL = 60
+
+# Trailing windows, in days, ending on the latest game day
+TRAILING_WINDOWS = (7, 14, 30)
+
+# Lock file, in the calculator's base directory, held by the one worker
+# process that runs the warm-up passes
+WARMUP_LOCK_FILE = '.warmup.lock'
+
+WARMUP_SECONDS = REGISTRY.histogram(
+    'dhh_warmup_seconds', 'Wall time of one warm-up pass over the common leaderboard windows.')
+WARMUP_ERRORS = REGISTRY.counter(
+    'dhh_warmup_errors_total', 'Leaderboard windows that failed to warm up.')
+
+
+def warmup_windows(date_range):
+    """
+    (label, stdate, endate) of the windows interactive users hit most: the
+    dashboard's default range, season-to-date, the trailing 7/14/30 days
+    and every full season, relative to the dataset's (first, last) days.
+    """
+    from .leaderboard import as_date
+    first_day, last_day = date_range
+    windows = [('default', as_date(DEFAULT_WINDOW[0]), as_date(DEFAULT_WINDOW[1]))]
+
+    season_start = max(first_day, last_day.replace(month=1, day=1))
+    windows.append(('season_to_date', season_start, last_day))
+    for days in TRAILING_WINDOWS:
+        windows.append((f'last_{days}_days', max(first_day, last_day - timedelta(days=days - 1)), last_day))
+
+    for year in range(first_day.year, last_day.year + 1):
+        windows.append((f'season_{year}', max(first_day, first_day.replace(year=year, month=1, day=1)),
+                        min(last_day, last_day.replace(year=year, month=12, day=31))))
+
+    # Season-to-date and the latest full season often coincide
+    unique = {}
+    for label, stdate, endate in windows:
+        unique.setdefault((stdate, endate), label)
+    return [(label, stdate, endate) for (stdate, endate), label in unique.items()]
+
+
+class WarmupScheduler:
+    """
+    Background thread that precomputes the common leaderboards.
+
+    Every `interval` seconds it checks the calculator's data version, and
+    when it changed (or on the first pass) runs DHHCalculator.process for
+    each warm-up window with the dashboard's engine, then builds the
+    batter offset index behind the player drill-down. Results land in the
+    process-wide leaderboard cache (and the shared ArrowStore), so
+    interactive requests find them warm; a request arriving mid-pass joins
+    the in-flight computation instead of repeating it.
+
+    Only the worker holding WARMUP_LOCK_FILE warms; the others retry the
+    lock every interval and take over if that worker exits.
+    """
+
+    def __init__(self, calculator_factory=None, interval=WARMUP_INTERVAL,
+                 engine=LEADERBOARD_ENGINE, quantiles='exact'):
+        # default_calculator unless given, resolved on the first pass
+        self.calculator_factory = calculator_factory
+        self.interval = interval
+        self.engine = engine
+        self.quantiles = quantiles
+        self.warmed_version = None
+        # Set once the first pass has ended, whether or not it warmed anything
+        self.first_pass = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_fd = None
+
+    def acquire(self, base_dir):
+        """
+        Take the warm-up lock of `base_dir` without blocking; True while
+        this process holds it.
+        """
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(base_dir, exist_ok=True)
+        fd = os.open(os.path.join(os.path.abspath(base_dir), WARMUP_LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o664)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def release(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def run_once(self, force=False):
+        """
+        Warm every window if the data version changed and this worker
+        holds the warm-up lock. Returns the number of leaderboards
+        computed or loaded.
+        """
+        if self.calculator_factory is None:
+            from .utils import default_calculator
+            self.calculator_factory = default_calculator
+        calculator = self.calculator_factory()
+        if not self.acquire(calculator.base_dir):
+            return 0
+        version = calculator.data_version()
+        if version == self.warmed_version and not force:
+            return 0
+        date_range = calculator.date_range()
+        if date_range is None:
+            return 0
+
+        start, warmed = time.perf_counter(), 0
+        for label, stdate, endate in warmup_windows(date_range):
+            if self._stop.is_set():
+                break
+            try:
+                calculator.process(stdate, endate, 0, engine=self.engine, quantiles=self.quantiles)
+                warmed += 1
+            except Exception as e:
+                WARMUP_ERRORS.inc()
+                logger.error("Warm-up of %s (%s..%s) failed: %s", label, stdate, endate, e)
+        if not self._stop.is_set():
+            try:
+                # The period comparison the dashboard opens with
+                calculator.process_periods('half', 0, engine=self.engine, quantiles=self.quantiles,
+                                           stdate=DEFAULT_WINDOW[0], endate=DEFAULT_WINDOW[1])
+                warmed += 1
+            except Exception as e:
+                WARMUP_ERRORS.inc()
+                logger.error("Warm-up of the default period comparison failed: %s", e)
+        try:
+            # The per-player offset index behind the drill-down
+            calculator.batter_index()
+        except Exception as e:
+            WARMUP_ERRORS.inc()
+            logger.error("Warm-up of the batter index failed: %s", e)
+        seconds = time.perf_counter() - start
+        WARMUP_SECONDS.observe(seconds)
+        # Data landing mid-pass changes the version again and triggers a new pass
+        self.warmed_version = version
+        logger.info("Warmed %d leaderboards for data version %s in %.2fs", warmed, version, seconds)
+        return warmed
+
+    def _run(self):
+        delay = 0
+        while not self._stop.wait(delay):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Warm-up pass failed: %s", e)
+            self.first_pass.set()
+            delay = self.interval
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='leaderboard-warmup', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._thread is None or not self._thread.is_alive():
+            self.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_warmup(interval=WARMUP_INTERVAL):
+    """
+    Start the process-wide warm-up scheduler once.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WarmupScheduler(interval=interval)
+        return _scheduler.start()
+
+
+def warmup_scheduler():
+    """
+    The process-wide warm-up scheduler, or None when it was never started.
+    """
+    return _scheduler
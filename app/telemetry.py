@@ -0,0 +1,119 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, request
+
+from .metrics import REGISTRY
+
+# Application log file, rotated by size
+LOG_FILE = '/var/www/basebotics/logs/flask_app.log'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Requests at least this slow are logged; Dash callbacks are always logged
+SLOW_REQUEST_SECONDS = 1.0
+
+# Dash's callback dispatch route, under each Dash app's url_base_pathname
+DASH_CALLBACK_ROUTE = '_dash-update-component'
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_seconds', 'Latency of Flask requests by route rule, method and status.',
+    ('route', 'method', 'status'))
+DASH_CALLBACK_SECONDS = REGISTRY.histogram(
+    'dash_callback_seconds', 'Latency of Dash callback requests by Dash app and callback outputs.',
+    ('app', 'callback', 'status'))
+
+logger = logging.getLogger('app.requests')
+logger.setLevel(logging.INFO)
+
+_listener = None
+_queue_handler = None
+_listener_lock = threading.Lock()
+
+
+def start_log_listener(target, path=LOG_FILE, level=logging.INFO):
+    """
+    Send the records of the `target` logger (and its children) through an
+    in-memory queue to a QueueListener thread that owns the rotating log
+    file, so request threads only enqueue and never format to or rotate a
+    file. The listener is started once per process and stopped at exit.
+    """
+    global _listener, _queue_handler
+    with _listener_lock:
+        if _listener is None:
+            # Opened by the listener on its first record, not at boot
+            file_handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, delay=True)
+            file_handler.setLevel(level)
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            log_queue = queue.SimpleQueue()
+            _queue_handler = QueueHandler(log_queue)
+            _queue_handler.setLevel(level)
+            _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+        if _queue_handler not in target.handlers:
+            target.addHandler(_queue_handler)
+    return _listener
+
+
+def dash_app_name(route):
+    """
+    Dash app of a callback route rule, e.g. 'app001' for
+    '/dashboard/app001/_dash-update-component'.
+    """
+    parts = [part for part in route.split('/') if part]
+    return parts[-2] if len(parts) > 1 else 'root'
+
+
+def init_request_metrics(app):
+    """
+    Time every request of `app` into REQUEST_SECONDS, labelled by route
+    rule (not URL, so path parameters do not multiply the series), and Dash
+    callback requests also into DASH_CALLBACK_SECONDS, labelled by the
+    callback's outputs.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        start = g.pop('request_start', None)
+        if start is None:
+            return response
+        seconds = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(seconds, route=route, method=request.method, status=response.status_code)
+
+        if route.endswith(DASH_CALLBACK_ROUTE):
+            # Dash has already parsed the body; get_json returns its cached copy
+            body = request.get_json(silent=True) or {}
+            callback = body.get('output', 'unknown')
+            DASH_CALLBACK_SECONDS.observe(seconds, app=dash_app_name(route), callback=callback,
+                                          status=response.status_code)
+            logger.info("dash callback app=%s callback=%s status=%s seconds=%.4f",
+                        dash_app_name(route), callback, response.status_code, seconds)
+        elif seconds >= SLOW_REQUEST_SECONDS:
+            logger.warning("slow request %s %s route=%s status=%s seconds=%.4f",
+                           request.method, request.path, route, response.status_code, seconds)
+        return response
+
+
+def latency_report(quantiles=(0.5, 0.95, 0.99)):
+    """
+    Request and Dash callback latency per series: count, mean and
+    estimated quantiles in seconds, slowest p95 first.
+    """
+    def series(histogram):
+        rows = [
+            {**labels, 'count': count, 'mean': mean, **{f'p{round(q * 100)}': value for q, value in estimates.items()}}
+            for labels, count, mean, estimates in histogram.summaries(quantiles)
+        ]
+        return sorted(rows, key=lambda row: row.get('p95', 0.0), reverse=True)
+
+    return {'requests': series(REQUEST_SECONDS), 'dash_callbacks': series(DASH_CALLBACK_SECONDS)}
@@ -0,0 +1,96 @@
+"""
+Speedup curve of the parallel engine.
+
+Times DHHCalculator.compute with engine='parallel' over one window (the
+whole synthetic dataset by default, i.e. every season) for a range of
+worker counts, next to the single-process pandas engine it shards. Each
+worker count gets its own pool, warmed by one untimed run so process
+start-up is not counted. Reports the median time, the speedup over one
+worker and over the pandas engine, and the parallel efficiency.
+
+    python -m benchmarks.parallel --scale 10 --workers 1 2 4 8 16 32
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+from app.routes.dash.utils import QUANTILE_MODES, DHHCalculator
+
+from .run import prepare_dataset, summarize, timed, window_bounds
+
+
+def default_workers():
+    """
+    1, 2, 4, ... up to the CPU count, which is always included.
+    """
+    cpus, counts, n = os.cpu_count() or 1, [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    return counts + [cpus]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Speedup curve of the parallel (process-pool) engine.")
+    parser.add_argument('--scale', type=float, default=10,
+                        help="Dataset size as a multiple of real pitch volume")
+    parser.add_argument('--window', type=int, default=0, help="Window width in days, 0 for the whole dataset")
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help="Worker counts to time (default: powers of two up to the CPU count)")
+    parser.add_argument('--quantiles', default='exact', choices=QUANTILE_MODES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--output', default=None, help="Results file (default: parallel-<UTC time>.json)")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or f"parallel-{started:%Y%m%dT%H%M%SZ}.json"
+    calculator, dataset = prepare_dataset(args.workdir, args.scale, args.seed, shared_store=False)
+    stdate, endate = window_bounds(args.window)
+
+    def median_seconds(calc, engine):
+        calc.compute(stdate, endate, 0, engine, args.quantiles)
+        samples = [timed(calc.compute, stdate, endate, 0, engine, args.quantiles)[1] for _ in range(args.repeat)]
+        return summarize(samples)
+
+    pandas_seconds = median_seconds(calculator, 'pandas')
+    print(f"pandas engine: {pandas_seconds['median']:.3f}s")
+
+    curve = []
+    for workers in args.workers or default_workers():
+        sharded = DHHCalculator(*calculator._init_args, workers=workers)
+        seconds = median_seconds(sharded, 'parallel')
+        curve.append({'workers': workers, 'seconds': seconds})
+
+    one_worker = next((point['seconds']['median'] for point in curve if point['workers'] == 1), None)
+    print(f"\n{'workers':>7} {'median':>9} {'vs 1':>7} {'vs pandas':>9} {'efficiency':>10}")
+    for point in curve:
+        median = point['seconds']['median']
+        point['speedup_vs_pandas'] = pandas_seconds['median'] / median
+        if one_worker is not None:
+            point['speedup'] = one_worker / median
+            point['efficiency'] = point['speedup'] / point['workers']
+        print(f"{point['workers']:>7} {median:>8.3f}s {point.get('speedup', float('nan')):>6.2f}x "
+              f"{point['speedup_vs_pandas']:>8.2f}x {point.get('efficiency', float('nan')):>9.0%}")
+
+    report = {
+        'meta': {
+            'started': started.isoformat(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+            'dataset': dataset,
+            'stdate': stdate.isoformat(),
+            'endate': endate.isoformat(),
+        },
+        'pandas_seconds': pandas_seconds,
+        'curve': curve,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
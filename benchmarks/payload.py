@@ -0,0 +1,160 @@
+"""
+Benchmark the Dash callback payloads of the Player Performance Tracker.
+
+Finds the leaderboard and period comparison table callbacks in the app's
+_dash-dependencies and calls each for the full roster (the "All" page
+size) through the Flask test client, once per Accept-Encoding. Reported per
+callback and encoding: response bytes on the wire, decoded JSON bytes and
+the median callback latency (compression included). The leaderboard is
+computed once before timing, so the cache is warm. Pass an earlier results
+file as --baseline to print the change.
+
+    python -m benchmarks.payload --output payload.json
+    python -m benchmarks.payload --baseline payload.json
+"""
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from app import create_app
+from app.routes.dash.dash_app001 import DEFAULT_WINDOW
+
+# Callbacks to time, found by an input only they have
+CALLBACKS = {
+    'leaderboard': 'leaderboard-table.page_current',
+    'comparison': 'comparison-table.page_current',
+}
+
+DECODERS = {'identity': lambda body: body, 'gzip': gzip.decompress}
+if brotli is not None:
+    DECODERS['br'] = brotli.decompress
+
+
+def parse_outputs(output):
+    """
+    [{'id', 'property'}] of a callback's output string ('a.b' or '..a.b...c.d..').
+    """
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in parts]
+
+
+def callback_body(callback, values):
+    """
+    _dash-update-component request body for `callback`, with input and
+    state values taken from `values` ('id.property' -> value).
+    """
+    def props(items):
+        return [{**item, 'value': values.get(f"{item['id']}.{item['property']}")} for item in items]
+
+    return {
+        'output': callback['output'],
+        'outputs': parse_outputs(callback['output']),
+        'inputs': props(callback['inputs']),
+        'state': props(callback['state']),
+        'changedPropIds': [f"{item['id']}.{item['property']}" for item in callback['inputs'][:1]],
+    }
+
+
+def measure(client, url, body, encoding, repeat):
+    samples, response = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post(url, json=body, headers={'Accept-Encoding': encoding})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"Callback failed with {response.status_code}: {response.data[:500]!r}")
+    served = response.headers.get('Content-Encoding', 'identity')
+    decoded = DECODERS[served](response.data)
+    return {
+        'content_encoding': served,
+        'wire_bytes': len(response.data),
+        'json_bytes': len(decoded),
+        'seconds': {'min': min(samples), 'median': statistics.median(samples), 'max': max(samples)},
+    }
+
+
+def compare(report, baseline_file):
+    """
+    Print size and latency changes against a baseline run.
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)['results']
+    print(f"\n{'callback':<12} {'encoding':<9} {'bytes before':>12} {'after':>9} {'ms before':>9} {'after':>7}")
+    for name, encodings in report['results'].items():
+        for encoding, result in encodings.items():
+            old = baseline.get(name, {}).get(encoding) or baseline.get(name, {}).get('identity')
+            if old is None:
+                continue
+            print(f"{name:<12} {encoding:<9} {old['wire_bytes']:>12} {result['wire_bytes']:>9} "
+                  f"{old['seconds']['median'] * 1e3:>9.1f} {result['seconds']['median'] * 1e3:>7.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Dash callback payload sizes and latency.")
+    parser.add_argument('--start-date', default=DEFAULT_WINDOW[0].date().isoformat())
+    parser.add_argument('--end-date', default=DEFAULT_WINDOW[1].date().isoformat())
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help="Results file (default: payload-<UTC time>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or f"payload-{started:%Y%m%dT%H%M%SZ}.json"
+    client = create_app().test_client()
+    client.get('/dashboard/app001/')
+    dependencies = client.get('/dashboard/app001/_dash-dependencies').get_json()
+    values = {
+        'stored-data.data': {'start_date': args.start_date, 'end_date': args.end_date, 'view': 'batter'},
+        'bbe-slider.value': 0,
+        'page-size-selector.value': -1,
+        'leaderboard-table.page_current': 0,
+        'leaderboard-table.sort_by': [],
+        'leaderboard-table.filter_query': '',
+        'compare-granularity.value': 'half',
+        'compare-metric.value': 'DHH%',
+        'comparison-table.page_current': 0,
+        'comparison-table.sort_by': [],
+        'comparison-table.filter_query': '',
+    }
+
+    url = '/dashboard/app001/_dash-update-component'
+    results = {}
+    for name, marker in CALLBACKS.items():
+        callback = next(cb for cb in dependencies
+                        if marker in (f"{item['id']}.{item['property']}" for item in cb['inputs']))
+        body = callback_body(callback, values)
+        client.post(url, json=body)
+        results[name] = {encoding: measure(client, url, body, encoding, args.repeat) for encoding in DECODERS}
+
+    report = {
+        'meta': {
+            'started': started.isoformat(),
+            'python': sys.version.split()[0],
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, encodings in results.items():
+        for encoding, result in encodings.items():
+            print(f"{name:<12} {encoding:<9} served={result['content_encoding']:<9} wire={result['wire_bytes']:>8} "
+                  f"json={result['json_bytes']:>8} median={result['seconds']['median'] * 1e3:.1f}ms")
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark DHHCalculator across data sizes, date-window widths and engines.
+
+For every scale a synthetic dataset is generated once under --workdir
+(see benchmarks.synthetic) and reused by later runs. Each case times the
+uncached pipeline (DHHCalculator.compute) with a per-stage breakdown from
+PipelineTrace, then one cold and one cached DHHCalculator.process call.
+Results are written as JSON; pass an earlier file as --baseline to print
+per-case speedups. Everything runs offline.
+
+    python -m benchmarks.run --scales 1 10 --output bench.json
+    python -m benchmarks.run --scales 1 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.routes.dash.cache import leaderboard_cache
+from app.routes.dash.trace import PipelineTrace
+from app.routes.dash.utils import ENGINES, QUANTILE_MODES, DHHCalculator
+
+from .synthetic import SEASONS, build_dataset, season_days
+
+# Window widths in days ending on the last game day; 0 means the whole dataset
+DEFAULT_WINDOWS = (7, 30, 183, 0)
+
+DATASET_MARKER = '_synthetic.json'
+
+
+def offline_calculator(base_dir, shared_store=False):
+    """
+    DHHCalculator over a synthetic dataset directory. The sheet URL is never
+    used because the player-ID database is written with the dataset.
+    """
+    return DHHCalculator('synthetic.parquet', 'offline', 'google_sheet.db', 'google_sheet', 'leaderboard.csv',
+                         base_dir, shared_store=shared_store)
+
+
+def prepare_dataset(workdir, scale, seed, shared_store):
+    """
+    Generate the dataset for `scale` unless an identical one exists.
+    Returns the calculator and the dataset description.
+    """
+    base_dir = os.path.join(workdir, f"scale_{scale:g}")
+    marker = os.path.join(base_dir, DATASET_MARKER)
+    if os.path.exists(marker):
+        with open(marker) as f:
+            dataset = json.load(f)
+        if dataset['scale'] == scale and dataset['seed'] == seed:
+            return offline_calculator(base_dir, shared_store), dataset
+
+    if os.path.isdir(base_dir) and os.listdir(base_dir):
+        raise RuntimeError(f"{base_dir} holds a different dataset; remove it or pick another --workdir")
+    calculator = offline_calculator(base_dir, shared_store)
+    start = time.perf_counter()
+    rows = build_dataset(calculator, scale, seed)
+    dataset = {'scale': scale, 'seed': seed, 'rows': rows, 'generate_seconds': round(time.perf_counter() - start, 3)}
+    with open(marker, 'w') as f:
+        json.dump(dataset, f)
+    return calculator, dataset
+
+
+def window_bounds(window_days):
+    endate = SEASONS[-1][1]
+    stdate = SEASONS[0][0] if window_days == 0 else endate - timedelta(days=window_days - 1)
+    return stdate, endate
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def summarize(samples):
+    return {
+        'min': min(samples), 'median': statistics.median(samples), 'max': max(samples),
+        'samples': [round(s, 6) for s in samples],
+    }
+
+
+def bench_case(calculator, engine, quantiles, stdate, endate, repeat, warmup):
+    """
+    Time one engine over one window. Returns the result record.
+    """
+    samples, stages, rows_out = [], {}, None
+    for i in range(warmup + repeat):
+        trace = PipelineTrace(engine, quantiles, stdate, endate)
+        result, seconds = timed(calculator.compute, stdate, endate, 0, engine, quantiles, trace)
+        if i < warmup:
+            continue
+        samples.append(seconds)
+        rows_out = len(result)
+        for stage in trace.stages:
+            stages.setdefault(stage['stage'], []).append(stage)
+
+    # process() end to end: first call misses every cache tier, second hits memory
+    leaderboard_cache.clear()
+    if calculator.shared_store:
+        calculator.arrow_store.prune('leaderboards', 0)
+    _, cold = timed(calculator.process, stdate, endate, 0, engine, quantiles)
+    _, cached = timed(calculator.process, stdate, endate, 0, engine, quantiles)
+
+    return {
+        'engine': engine,
+        'quantiles': quantiles,
+        'rows_out': rows_out,
+        'seconds': summarize(samples),
+        'process_cold_seconds': cold,
+        'process_cached_seconds': cached,
+        'stages': {
+            name: {
+                'median_seconds': statistics.median(s['seconds'] for s in runs),
+                'rows_in': runs[-1]['rows_in'],
+                'rows_out': runs[-1]['rows_out'],
+                'max_peak_rss_delta': max(s['peak_rss_delta'] for s in runs),
+            }
+            for name, runs in stages.items()
+        },
+    }
+
+
+def case_key(result):
+    return result['scale'], result['window_days'], result['engine'], result['quantiles']
+
+
+def compare(results, baseline_file):
+    """
+    Print median-time speedups against the matching cases of a baseline run.
+    """
+    with open(baseline_file) as f:
+        baseline = {case_key(r): r for r in json.load(f)['results'] if 'seconds' in r}
+    print(f"\n{'scale':>6} {'window':>6} {'engine':>7} {'quantiles':>9} {'baseline':>10} {'current':>10} {'speedup':>8}")
+    for result in results:
+        before = baseline.get(case_key(result))
+        if before is None or 'seconds' not in result:
+            continue
+        old, new = before['seconds']['median'], result['seconds']['median']
+        print(f"{result['scale']:>6g} {result['window_days'] or 'all':>6} {result['engine']:>7} "
+              f"{result['quantiles']:>9} {old:>10.4f} {new:>10.4f} {old / new:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DHH leaderboard pipeline on synthetic data.")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10],
+                        help="Dataset sizes as multiples of real pitch volume (100 needs ~15 GB of disk)")
+    parser.add_argument('--windows', type=int, nargs='+', default=list(DEFAULT_WINDOWS),
+                        help="Window widths in days, 0 for the whole dataset")
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=ENGINES)
+    parser.add_argument('--quantiles', nargs='+', default=['exact'], choices=QUANTILE_MODES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shared-store', action='store_true', help="Scan through the memory-mapped Arrow store")
+    parser.add_argument('--pandas-max-rows', type=int, default=20_000_000,
+                        help="Skip the pandas engine on windows estimated to exceed this many pitches")
+    parser.add_argument('--workdir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--output', default=None, help="Results file (default: bench-<UTC time>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or f"bench-{started:%Y%m%dT%H%M%SZ}.json"
+    total_days = len(season_days())
+    datasets, results = {}, []
+
+    for scale in args.scales:
+        calculator, dataset = prepare_dataset(args.workdir, scale, args.seed, args.shared_store)
+        datasets[f"{scale:g}"] = dataset
+        for window_days in args.windows:
+            stdate, endate = window_bounds(window_days)
+            window_rows = dataset['rows'] * min(window_days or total_days, total_days) / total_days
+            for engine in args.engines:
+                for quantiles in args.quantiles:
+                    record = {'scale': scale, 'window_days': window_days,
+                              'stdate': stdate.isoformat(), 'endate': endate.isoformat()}
+                    if engine == 'pandas' and window_rows > args.pandas_max_rows:
+                        results.append({**record, 'engine': engine, 'quantiles': quantiles,
+                                        'skipped': f"~{window_rows:.0f} pitches > --pandas-max-rows"})
+                        continue
+                    result = {**record, **bench_case(calculator, engine, quantiles, stdate, endate,
+                                                     args.repeat, args.warmup)}
+                    results.append(result)
+                    print(f"scale={scale:g} window={window_days or 'all'} engine={engine} quantiles={quantiles} "
+                          f"median={result['seconds']['median']:.4f}s cached={result['process_cached_seconds']:.4f}s")
+
+    report = {
+        'meta': {
+            'started': started.isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'versions': {'pandas': pd.__version__, 'numpy': np.__version__,
+                         'duckdb': duckdb.__version__, 'pyarrow': pa.__version__},
+            'args': vars(args),
+            'datasets': datasets,
+        },
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark worker cold start.
+
+Each sample runs a fresh interpreter under `python -X importtime` that
+imports the app and calls create_app(), as basebotics.wsgi does, then
+serves the base routes once. Reported per sample: wall time of the whole
+process, create_app() time, first-request time, total import time, and
+the RSS and heavy analytics modules loaded at boot (after create_app).
+
+The background leaderboard warm-up is on, as in production. It starts
+after the first request and imports the analytics stack, so each sample
+also waits for its first pass and reports how long it took, and peak RSS
+and heavy modules are taken after it: the footprint of a worker that has
+warmed up. --no-warmup measures the boot path alone. Pass an earlier
+results file as --baseline to print the change.
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --baseline startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Modules a worker should not need to serve the base routes
+HEAVY_MODULES = ('pandas', 'numpy', 'duckdb', 'pyarrow', 'gdown', 'sqlite3', 'dask', 'polars')
+
+DEFAULT_PATHS = ('/', '/about')
+
+# Longest wait for the first warm-up pass of a sample
+WARMUP_TIMEOUT = 600
+
+CHILD = """
+import json, resource, sys, time
+def rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+def heavy():
+    return [name for name in {heavy!r} if name in sys.modules]
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+booted = time.perf_counter()
+boot_rss, boot_heavy = rss(), heavy()
+client = app.test_client()
+statuses = [client.get(path).status_code for path in {paths!r}]
+served = time.perf_counter()
+warmup_seconds = None
+if {warmup!r}:
+    from app.routes.dash.warmup import warmup_scheduler
+    scheduler = warmup_scheduler()
+    if scheduler is None or not scheduler.first_pass.wait({timeout!r}):
+        sys.exit('The warm-up did not finish its first pass')
+    warmup_seconds = time.perf_counter() - served
+print(json.dumps({{
+    'create_app_seconds': booted - start,
+    'first_requests_seconds': served - booted,
+    'warmup_seconds': warmup_seconds,
+    'statuses': statuses,
+    'boot_rss_bytes': boot_rss,
+    'boot_heavy_modules': boot_heavy,
+    'max_rss_bytes': rss(),
+    'modules_loaded': len(sys.modules),
+    'heavy_modules': heavy(),
+}}))
+"""
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr, top=15):
+    """
+    Total import time (sum of the top-level imports' cumulative time) and
+    the `top` packages by self time, in seconds, from -X importtime output.
+    """
+    total, packages = 0, {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        if len(indent) == 1:
+            total += int(cumulative_us)
+        package = module.split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total / 1e6, {package: round(us / 1e6, 6) for package, us in ranked}
+
+
+def sample(paths, warmup):
+    """
+    Boot one worker in a fresh interpreter and return its measurements.
+    """
+    env = dict(os.environ, BASEBOTICS_WARMUP='1' if warmup else '0')
+    code = CHILD.format(paths=list(paths), heavy=HEAVY_MODULES, warmup=warmup, timeout=WARMUP_TIMEOUT)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                          env=env, cwd=os.getcwd())
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Worker boot failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['wall_seconds'] = wall
+    result['import_seconds'], result['top_packages'] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(samples, field):
+    values = [s[field] for s in samples]
+    return {'min': min(values), 'median': statistics.median(values), 'max': max(values)}
+
+
+METRICS = ('wall_seconds', 'import_seconds', 'create_app_seconds', 'first_requests_seconds', 'boot_rss_bytes',
+           'max_rss_bytes')
+WARMUP_METRICS = ('warmup_seconds',)
+
+
+def compare(report, baseline_file):
+    """
+    Print median changes against a baseline run.
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)['summary']
+    print(f"\n{'metric':<24} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric in report['summary']:
+        if metric not in baseline:
+            continue
+        old, new = baseline[metric]['median'], report['summary'][metric]['median']
+        print(f"{metric:<24} {old:>12.4g} {new:>12.4g} {old / new:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark worker cold start (import and create_app).")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--paths', nargs='+', default=list(DEFAULT_PATHS), help="Routes served after boot")
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false',
+                        help="Turn the background leaderboard warm-up off and measure the boot path alone")
+    parser.add_argument('--output', default=None, help="Results file (default: startup-<UTC time>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or f"startup-{started:%Y%m%dT%H%M%SZ}.json"
+    samples = [sample(args.paths, args.warmup) for _ in range(args.repeat)]
+    metrics = METRICS + (WARMUP_METRICS if args.warmup else ())
+    report = {
+        'meta': {
+            'started': started.isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'summary': {metric: summarize(samples, metric) for metric in metrics},
+        'boot_heavy_modules': samples[-1]['boot_heavy_modules'],
+        'heavy_modules': samples[-1]['heavy_modules'],
+        'top_packages': samples[-1]['top_packages'],
+        'samples': samples,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for metric in metrics:
+        print(f"{metric:<24} median={report['summary'][metric]['median']:.4g}")
+    print(f"heavy modules loaded at boot: {', '.join(report['boot_heavy_modules']) or 'none'}")
+    print(f"heavy modules loaded at exit: {', '.join(report['heavy_modules']) or 'none'}")
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Synthetic Statcast pitch data for benchmarks.
+
+Generates pitch-level rows with the columns DHHCalculator.load_data reads
+(game_date, player_name, batter, description, launch_speed, launch_angle,
+release_speed, hit_distance_sc), and the pitcher, home_team, away_team and
+inning_topbot columns the grouped leaderboards read, over the two seasons
+the production export covers, plus a matching player-ID database, so the
+pipeline runs without the real parquet file or network access.
+
+At scale 1 a game day has about as many pitches as a real one (~4,300), so
+the two seasons hold ~1.6M pitches; scale 10 and 100 multiply that volume.
+
+    python -m benchmarks.synthetic /tmp/bench/scale_1 --scale 1
+"""
+import argparse
+import os
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Regular-season spans of the production export
+SEASONS = ((date(2023, 3, 30), date(2023, 10, 1)), (date(2024, 3, 28), date(2024, 9, 30)))
+
+PITCHES_PER_DAY = 4300
+BATTERS = 650
+PITCHERS = 480
+
+TEAMS = ('ARI', 'ATL', 'BAL', 'BOS', 'CHC', 'CWS', 'CIN', 'CLE', 'COL', 'DET', 'HOU', 'KC', 'LAA', 'LAD', 'MIA',
+         'MIL', 'MIN', 'NYM', 'NYY', 'OAK', 'PHI', 'PIT', 'SD', 'SF', 'SEA', 'STL', 'TB', 'TEX', 'TOR', 'WSH')
+
+# Pitch outcomes and their approximate league-wide shares
+DESCRIPTIONS = {
+    'ball': 0.35, 'called_strike': 0.16, 'swinging_strike': 0.11, 'foul': 0.18,
+    'hit_into_play': 0.17, 'blocked_ball': 0.02, 'hit_by_pitch': 0.01,
+}
+
+# Batted balls (in play and fouls) carry launch data
+BATTED = ('hit_into_play', 'foul')
+
+
+def season_days(seasons=SEASONS):
+    days = []
+    for start, end in seasons:
+        days.extend(start + timedelta(days=i) for i in range((end - start).days + 1))
+    return days
+
+
+def make_players(batters=BATTERS, seed=0):
+    """
+    One row per batter: MLBID, names, playing-time weight and the batter's
+    own EV/LA means, so leaderboards have a realistic spread.
+    """
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(np.arange(400000, 700000), size=batters, replace=False)
+    return pd.DataFrame({
+        'batter': ids.astype('int64'),
+        'player_name': [f"Batter{i:04d}, Synthetic" for i in range(batters)],
+        'weight': rng.gamma(2.0, 1.0, batters),
+        'ev_mean': rng.normal(88.0, 3.0, batters),
+        'la_mean': rng.normal(12.0, 5.0, batters),
+    })
+
+
+def make_pitchers(pitchers=PITCHERS, seed=0):
+    """
+    One row per pitcher: MLBID (outside the batter ID range) and name.
+    Pitcher i plays for TEAMS[i % len(TEAMS)], as batter i does.
+    """
+    rng = np.random.default_rng(seed + 2)
+    ids = rng.choice(np.arange(700000, 800000), size=pitchers, replace=False)
+    return pd.DataFrame({
+        'pitcher': ids.astype('int64'),
+        'player_name': [f"Pitcher{i:04d}, Synthetic" for i in range(pitchers)],
+    })
+
+
+def generate_day(day, players, rng, scale=1.0, pitchers=None):
+    """
+    Pitches of one game day. Each batter faces a pitcher of another team,
+    at home or away.
+    """
+    pitchers = make_pitchers() if pitchers is None else pitchers
+    n = rng.poisson(PITCHES_PER_DAY * scale)
+    who = rng.choice(len(players), size=n, p=(players['weight'] / players['weight'].sum()).to_numpy())
+    description = rng.choice(list(DESCRIPTIONS), size=n, p=list(DESCRIPTIONS.values()))
+    batted = np.isin(description, BATTED)
+    in_play = description == 'hit_into_play'
+
+    launch_speed = np.clip(rng.normal(players['ev_mean'].to_numpy()[who], 14.0), 20.0, 122.0).round(1)
+    launch_angle = np.clip(rng.normal(players['la_mean'].to_numpy()[who], 26.0), -85.0, 85.0).round()
+    hit_distance = np.clip((launch_speed - 40.0) * 4.5 * np.cos(np.radians(launch_angle - 28.0)), 0.0, 480.0).round()
+
+    teams = len(TEAMS)
+    batting_team = who % teams
+    pitching_team = (batting_team + rng.integers(1, teams, n)) % teams
+    staff = -(-len(pitchers) // teams)
+    pitcher = np.minimum(pitching_team + teams * rng.integers(0, staff, n), len(pitchers) - 1)
+    pitching_team = pitcher % teams
+    top = rng.random(n) < 0.5
+    team_names = np.array(TEAMS, dtype=object)
+
+    return pd.DataFrame({
+        'game_date': pd.Timestamp(day),
+        'player_name': players['player_name'].to_numpy()[who],
+        'batter': players['batter'].to_numpy()[who],
+        'description': description,
+        'launch_speed': np.where(batted, launch_speed, np.nan),
+        'launch_angle': np.where(batted, launch_angle, np.nan),
+        'release_speed': rng.normal(89.0, 6.0, n).round(1),
+        'hit_distance_sc': np.where(in_play, hit_distance, np.nan),
+        'pitcher': pitchers['pitcher'].to_numpy()[pitcher],
+        'home_team': team_names[np.where(top, pitching_team, batting_team)],
+        'away_team': team_names[np.where(top, batting_team, pitching_team)],
+        'inning_topbot': np.where(top, 'Top', 'Bot'),
+    })
+
+
+def generate_pitches(scale=1.0, seed=0, players=None, seasons=SEASONS, chunk_days=31, pitchers=None):
+    """
+    Yield the synthetic pitches in chunks of `chunk_days` game days, so
+    large scales never need the whole dataset in memory.
+    """
+    rng = np.random.default_rng(seed + 1)
+    players = make_players(seed=seed) if players is None else players
+    pitchers = make_pitchers(seed=seed) if pitchers is None else pitchers
+    days = season_days(seasons)
+    for i in range(0, len(days), chunk_days):
+        yield pd.concat([generate_day(day, players, rng, scale, pitchers) for day in days[i:i + chunk_days]],
+                        ignore_index=True)
+
+
+def write_player_ids(db_file_name, table_name, players, pitchers=None):
+    """
+    Player-ID database with the sheet columns the registry reads, batters
+    first, then pitchers.
+    """
+    people = pd.concat([
+        pd.DataFrame({'MLBID': players['batter'], 'player_name': players['player_name'], 'POS': 'DH'}),
+        pd.DataFrame({'MLBID': [] if pitchers is None else pitchers['pitcher'],
+                      'player_name': [] if pitchers is None else pitchers['player_name'], 'POS': 'P'}),
+    ], ignore_index=True)
+    sheet = pd.DataFrame({
+        'IDPLAYER': [f"synthetic{i:04d}" for i in range(len(people))],
+        'PLAYERNAME': people['player_name'],
+        'TEAM': 'SYN',
+        'POS': people['POS'],
+        'IDFANGRAPHS': [str(30000 + i) for i in range(len(people))],
+        'FANGRAPHSNAME': people['player_name'],
+        'MLBID': people['MLBID'].astype('float64'),
+        'MLBNAME': people['player_name'],
+        'BREFID': [f"synth{i:04d}" for i in range(len(people))],
+    })
+    if os.path.exists(db_file_name):
+        os.remove(db_file_name)
+    conn = sqlite3.connect(db_file_name)
+    try:
+        sheet.to_sql(table_name, conn, index=False)
+    finally:
+        conn.close()
+
+
+def build_dataset(calculator, scale=1.0, seed=0):
+    """
+    Ingest a synthetic dataset through `calculator` (its partitions, rollup
+    and player-ID database). Returns the number of pitches written.
+    """
+    players, pitchers = make_players(seed=seed), make_pitchers(seed=seed)
+    write_player_ids(calculator.db_file_name, calculator.table_name, players, pitchers)
+    rows = 0
+    for chunk in generate_pitches(scale, seed, players, pitchers=pitchers):
+        calculator.ingest(chunk)
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic Statcast dataset for benchmarks.")
+    parser.add_argument('base_dir', help="DHHCalculator base directory to create")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiple of real per-day pitch volume")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from .run import offline_calculator
+
+    rows = build_dataset(offline_calculator(args.base_dir), args.scale, args.seed)
+    print(f"Wrote {rows} synthetic pitches to {args.base_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+from datetime import date
+
+import pytest
+
+from benchmarks.run import offline_calculator
+from benchmarks.synthetic import generate_pitches, make_pitchers, make_players, write_player_ids
+
+# Three weeks of synthetic pitches at a quarter of real daily volume
+# (~22k pitches, 60 batters): enough batted balls per player for the
+# quantiles to be meaningful, small enough to ingest in well under a second
+WINDOW = (date(2024, 4, 1), date(2024, 4, 21))
+SCALE = 0.25
+BATTERS = 60
+PITCHERS = 60
+
+
+@pytest.fixture(scope='session')
+def window():
+    return WINDOW
+
+
+@pytest.fixture(scope='session')
+def calculator(tmp_path_factory):
+    """
+    DHHCalculator over a synthetic dataset ingested once per test session,
+    with its player-ID database.
+    """
+    calculator = offline_calculator(str(tmp_path_factory.mktemp('synthetic')))
+    players, pitchers = make_players(BATTERS), make_pitchers(PITCHERS)
+    write_player_ids(calculator.db_file_name, calculator.table_name, players, pitchers)
+    for chunk in generate_pitches(SCALE, players=players, seasons=(WINDOW,), pitchers=pitchers):
+        calculator.ingest(chunk)
+    return calculator
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from app.routes.dash.cache import leaderboard_cache, leaderboard_flights
+
+CALLERS = 8
+
+
+def wait_for_followers(followers, before, timeout=10.0):
+    """
+    Block until `followers` callers have joined the flight in progress.
+    """
+    deadline = time.monotonic() + timeout
+    while leaderboard_flights.stats()['coalesced'] - before < followers:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Callers did not join the flight")
+        time.sleep(0.005)
+
+
+def run_concurrently(fn, callers=CALLERS):
+    """
+    Call `fn` from `callers` threads at once; returns (results, errors).
+    """
+    barrier = threading.Barrier(callers)
+    results, errors = [], []
+
+    def call():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class CountingLoad:
+    """
+    Stand-in for DHHCalculator.load_data that counts its calls. Each call
+    first waits until every other caller has joined its flight, so the
+    callers are truly concurrent, then raises `error` if set or loads.
+    """
+
+    def __init__(self, load_data, followers):
+        self.load_data = load_data
+        self.followers = followers
+        self.before = leaderboard_flights.stats()['coalesced']
+        self.calls = 0
+        self.error = None
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        wait_for_followers(self.followers, self.before)
+        if self.error is not None:
+            raise self.error
+        return self.load_data(*args, **kwargs)
+
+
+@pytest.fixture
+def counting_load(calculator, monkeypatch):
+    leaderboard_cache.clear()
+    counting = CountingLoad(calculator.load_data, CALLERS - 1)
+    monkeypatch.setattr(calculator, 'load_data', counting)
+    yield counting
+    leaderboard_cache.clear()
+
+
+def test_concurrent_callers_share_one_computation(calculator, window, counting_load):
+    results, errors = run_concurrently(lambda: calculator.process(*window, 0, engine='pandas'))
+
+    assert errors == []
+    assert counting_load.calls == 1
+    assert len(results) == CALLERS
+    for result in results[1:]:
+        assert result.equals(results[0])
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == CALLERS
+
+
+def test_exception_reaches_every_waiter(calculator, window, counting_load):
+    counting_load.error = RuntimeError("scan failed")
+    results, errors = run_concurrently(lambda: calculator.process(*window, 0, engine='pandas'))
+
+    assert results == []
+    assert counting_load.calls == 1
+    assert len(errors) == CALLERS
+    assert all(isinstance(e, RuntimeError) and str(e) == "scan failed" for e in errors)
+    assert leaderboard_flights.stats()['in_flight'] == 0
+
+
+def test_cold_then_warm_call_counts_one_miss_and_one_hit(calculator, window):
+    leaderboard_cache.clear()
+    before = leaderboard_cache.stats()
+    calculator.process(*window, 0, engine='sql')
+    cold = leaderboard_cache.stats()
+    calculator.process(*window, 0, engine='sql')
+    warm = leaderboard_cache.stats()
+    leaderboard_cache.clear()
+
+    assert (cold['misses'] - before['misses'], cold['hits'] - before['hits']) == (1, 0)
+    assert cold['entries'] == before['entries'] + 1
+    assert (warm['misses'] - cold['misses'], warm['hits'] - cold['hits']) == (0, 1)
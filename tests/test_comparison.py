@@ -0,0 +1,13 @@
+from app.routes.dash import utils
+from app.routes.dash.dash_app001 import LEADERBOARD_ENGINE, comparison_frame
+
+
+def test_comparison_has_one_row_per_player(calculator, window, monkeypatch):
+    monkeypatch.setattr(utils, 'default_calculator', lambda: calculator)
+    periods = calculator.process_periods('week', 0, engine=LEADERBOARD_ENGINE, stdate=window[0], endate=window[1])
+
+    wide = comparison_frame(*window, 'week', 'BBE')
+
+    assert len(wide) == periods['MLBID'].nunique() > 0
+    assert list(wide.columns) == ['Player', *dict.fromkeys(periods['Period']), 'Change']
+    assert wide['Player'].notna().all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.routes.dash.utils import ENGINES, LEADERBOARD_COLUMNS
+
+# The pandas engine keeps release speed and hit distance in float32
+# (PITCH_DTYPES), the sql engine reads them as stored: averages agree to
+# float32 precision
+FLOAT32_RTOL = 1e-6
+
+
+@pytest.mark.parametrize('engine', ['sql', 'parallel'])
+def test_engine_matches_pandas_engine(calculator, window, engine, monkeypatch):
+    # Several shards, so the parallel engine runs them in its process pool
+    monkeypatch.setattr(calculator, 'workers', 3)
+    pandas_board = calculator.compute(*window, 0, engine='pandas')
+    board = calculator.compute(*window, 0, engine=engine)
+
+    assert list(board.columns) == list(pandas_board.columns)
+    assert board.dtypes.equals(pandas_board.dtypes)
+    assert len(pandas_board) > 0
+    assert set(board['MLBID']) == set(pandas_board['MLBID'])
+
+    pandas_board = pandas_board.set_index('MLBID').sort_index()
+    board = board.set_index('MLBID').sort_index()
+    numeric = pandas_board.select_dtypes('number').columns
+    np.testing.assert_allclose(board[numeric].to_numpy(), pandas_board[numeric].to_numpy(),
+                               rtol=FLOAT32_RTOL, atol=0)
+    other = pandas_board.columns.difference(numeric)
+    pd.testing.assert_frame_equal(board[other], pandas_board[other])
+
+
+def test_engines_cover_leaderboard_columns(calculator, window):
+    board = calculator.compute(*window, 0, engine='sql')
+    stats = [col for col in LEADERBOARD_COLUMNS if col not in ('player_name', 'batter')]
+    assert set(stats) <= set(board.columns)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_open_window_covers_the_dataset(calculator, window, engine):
+    board = calculator.process(None, None, 0, engine=engine, use_cache=False)
+    full = calculator.process(*window, 0, engine=engine, use_cache=False)
+    assert len(board) == len(full) > 0
+    assert set(board['MLBID']) == set(full['MLBID'])
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from app.routes.dash.sketch import RELATIVE_ACCURACY
+
+QUANTILE_COLUMNS = ['P95 EV', 'P90 EV', 'P50 EV']
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'sql', 'rollup'])
+def test_approx_quantiles_within_sketch_accuracy(calculator, window, engine):
+    exact = calculator.compute(*window, 0, engine=engine, quantiles='exact').set_index('MLBID').sort_index()
+    approx = calculator.compute(*window, 0, engine=engine, quantiles='approx').set_index('MLBID').sort_index()
+
+    assert approx.index.equals(exact.index)
+    for col in QUANTILE_COLUMNS:
+        error = np.abs(approx[col] - exact[col])
+        # Documented bound of the sketch, with room for float rounding only
+        bound = RELATIVE_ACCURACY * exact[col].abs() * (1 + 1e-9)
+        assert (error <= bound).all(), f"{col}: max error {error.max():.4f} mph exceeds the sketch's accuracy"
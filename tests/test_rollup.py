@@ -0,0 +1,46 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from test_engines import FLOAT32_RTOL
+
+
+def assert_same_leaderboard(board, reference):
+    assert list(board.columns) == list(reference.columns)
+    assert board.dtypes.equals(reference.dtypes)
+    board = board.set_index('MLBID').sort_index()
+    reference = reference.set_index('MLBID').sort_index()
+    assert board.index.equals(reference.index)
+    numeric = reference.select_dtypes('number').columns
+    np.testing.assert_allclose(board[numeric].to_numpy(), reference[numeric].to_numpy(), rtol=FLOAT32_RTOL, atol=0)
+    other = reference.columns.difference(numeric)
+    pd.testing.assert_frame_equal(board[other], reference[other])
+
+
+@pytest.mark.parametrize('quantiles', ['exact', 'approx'])
+def test_rollup_matches_pandas_over_several_days(calculator, quantiles):
+    window = (date(2024, 4, 3), date(2024, 4, 16))
+    reference = calculator.compute(*window, 0, engine='pandas', quantiles=quantiles)
+    assert len(reference) > 0
+    assert_same_leaderboard(calculator.compute(*window, 0, engine='rollup', quantiles=quantiles), reference)
+
+
+def test_rollup_matches_pandas_per_period(calculator, window):
+    periods = [('early', date(2024, 4, 1), date(2024, 4, 10)), ('late', date(2024, 4, 8), date(2024, 4, 21))]
+    reference = calculator.process_periods(periods, engine='pandas', use_cache=False)
+    board = calculator.process_periods(periods, engine='rollup', use_cache=False)
+    for label, _, _ in periods:
+        assert_same_leaderboard(board[board['Period'] == label].reset_index(drop=True),
+                                reference[reference['Period'] == label].reset_index(drop=True))
+
+
+def test_rollup_empty_window_matches_pandas(calculator):
+    window = (date(2024, 5, 1), date(2024, 5, 7))
+    reference = calculator.compute(*window, 0, engine='pandas')
+    board = calculator.compute(*window, 0, engine='rollup')
+    assert len(reference) == len(board) == 0
+    assert list(board.columns) == list(reference.columns)
+    assert board.dtypes.equals(reference.dtypes)
+
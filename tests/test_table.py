@@ -0,0 +1,34 @@
+import pandas as pd
+
+from app.routes.dash.table import filter_frame, split_filter_part
+
+BOARD = pd.DataFrame({
+    'Player': ['Batter0001, Synthetic', 'Batter0100, Synthetic', 'Batter0200, Synthetic'],
+    'BBE': [12, 40, 85],
+    'DHH%': [10.5, 22.0, 31.25],
+})
+
+
+def test_bare_values_stay_text():
+    assert split_filter_part('{Player} contains 00') == ('Player', 'contains', '00', True)
+    assert split_filter_part('{BBE} >= 40') == ('BBE', 'ge', '40', True)
+    assert split_filter_part('{Player} icontains "a b"') == ('Player', 'contains', 'a b', False)
+
+
+def test_contains_matches_digits_as_text():
+    assert list(filter_frame(BOARD, '{Player} contains 00')['BBE']) == [12, 40, 85]
+    assert list(filter_frame(BOARD, '{Player} contains 0100')['BBE']) == [40]
+
+
+def test_comparisons_on_numeric_columns_are_numeric():
+    assert list(filter_frame(BOARD, '{BBE} >= 40')['BBE']) == [40, 85]
+    assert list(filter_frame(BOARD, '{DHH%} lt "22"')['BBE']) == [12]
+    assert list(filter_frame(BOARD, '{BBE} >= 40 && {DHH%} > 30')['BBE']) == [85]
+
+
+def test_text_compared_with_numeric_column_is_ignored():
+    assert len(filter_frame(BOARD, '{BBE} > many')) == len(BOARD)
+
+
+def test_case_insensitive_equality_on_text():
+    assert list(filter_frame(BOARD, '{Player} ieq "batter0200, synthetic"')['BBE']) == [85]